@@ -0,0 +1,102 @@
+import subprocess
+import time
+
+from adb_screenshot import AdbScreenshotMixin
+from adb_transport import ADB_SERVER_HOST, ADB_SERVER_PORT, AdbTransport, AdbTransportError
+from base import BaseEmulatorController
+from connection_health import ConnectionHealth
+
+
+class AdbController(AdbScreenshotMixin, BaseEmulatorController):
+    """
+    Controller for an Android instance that is managed elsewhere, driven only through adb.
+
+    It never starts, stops or configures emulator processes: stop() just
+    closes its own adb session. This makes it the controller of choice for
+    extra instances in a ControllerPool, and it runs against any server that
+    speaks the adb smart-socket protocol, including a fake one in tests.
+    """
+
+    def __init__(
+        self,
+        adb_serial: str,
+        host: str = ADB_SERVER_HOST,
+        port: int = ADB_SERVER_PORT,
+        frame_cache_max_age: float = 0.2,
+        timeout: float = 30.0,
+    ):
+        self.adb_serial = adb_serial
+        self.owns_processes = False
+        self.transport = AdbTransport(adb_serial, host=host, port=port, timeout=timeout)
+        self.health = ConnectionHealth(probe_interval=5.0)
+        self._init_screenshots(frame_cache_max_age)
+
+    def is_connected(self) -> bool:
+        """Returns True if the adb server lists this instance as an online device"""
+        result = self.transport.host_service("host:devices")
+        for line in result.stdout.strip().splitlines():
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] == self.adb_serial:
+                return fields[1] == "device"
+        return False
+
+    def _is_connected(self) -> bool:
+        try:
+            return self.is_connected()
+        except AdbTransportError:
+            return False
+
+    def _run(self, run, command: str) -> subprocess.CompletedProcess:
+        """Runs one transport call, reporting its outcome to the connection health"""
+        try:
+            result = run(command)
+        except AdbTransportError as error:
+            self.health.record_failure()
+            raise RuntimeError(f"adb command '{command}' failed on {self.adb_serial}: {error}") from error
+        self.health.record_success()
+        return result
+
+    def _shell(self, command: str) -> subprocess.CompletedProcess:
+        return self._run(self.transport.shell, command)
+
+    def _exec_out(self, command: str) -> subprocess.CompletedProcess:
+        return self._run(self.transport.exec_out, command)
+
+    def restart(self):
+        self.stop()
+        return self.is_connected()
+
+    def start(self):
+        """
+        Nothing to start, the instance is managed elsewhere.
+        """
+
+    def stop(self):
+        """
+        Closes this controller's adb session, the instance itself keeps running.
+        """
+        transport = getattr(self, "transport", None)
+        if transport is not None:
+            transport.close()
+
+    def click(self, x_coord: int, y_coord: int, clicks: int = 1, interval: float = 0.0):
+        for i in range(clicks):
+            self._shell(f"input tap {x_coord} {y_coord}")
+            if clicks == 1:
+                break
+            time.sleep(interval)
+        self.invalidate_frame_cache()
+
+    def swipe(
+        self,
+        x_coord1: int,
+        y_coord1: int,
+        x_coord2: int,
+        y_coord2: int,
+    ):
+        self._shell(f"input swipe {x_coord1} {y_coord1} {x_coord2} {y_coord2}")
+        self.invalidate_frame_cache()
+
+    def start_app(self, package_name: str):
+        self._shell(f"monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
+        self.invalidate_frame_cache()
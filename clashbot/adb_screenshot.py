@@ -0,0 +1,135 @@
+import subprocess
+
+import cv2
+import numpy as np
+
+from frame_cache import FrameCache
+from image_handler import RAW_FAILURES_BEFORE_PNG, InvalidImageError, open_from_raw_framebuffer
+
+DEBUG = False
+
+
+class AdbScreenshotMixin:
+    """
+    screencap-based screenshot() shared by the controllers that drive an instance through adb.
+
+    Frames are read from the uncompressed framebuffer (``screencap`` without
+    ``-p``), which skips PNG encoding on the device and decoding here. A bad
+    raw read is retried once, and only a framebuffer that stays unreadable for
+    RAW_FAILURES_BEFORE_PNG captures in a row switches the controller to
+    ``screencap -p`` for good. Captures are shared through a FrameCache, and
+    their outcome feeds the controller's ConnectionHealth, so connectivity is
+    only probed after a failure.
+
+    Controllers call _init_screenshots() from __init__ once ``self.health``
+    exists, and implement _exec_out() and _is_connected().
+    """
+
+    def _init_screenshots(self, frame_cache_max_age: float):
+        # recognizers within one decision tick share a single capture
+        self.frame_cache = FrameCache(max_age=frame_cache_max_age)
+
+        # "raw" reads the uncompressed framebuffer, "png" is the compatible fallback
+        self.screenshot_mode = "raw"
+        self.raw_failures = 0
+
+    def _exec_out(self, command: str) -> subprocess.CompletedProcess:
+        """Runs ``adb exec-out <command>``, returning its binary stdout"""
+        raise NotImplementedError
+
+    def _is_connected(self) -> bool:
+        """Returns True if the instance is connected and not offline"""
+        raise NotImplementedError
+
+    def _log_screenshot_warning(self, message: str):
+        print(message)
+
+    def invalidate_frame_cache(self):
+        """
+        Drops the cached screenshot so the next screenshot() captures a fresh frame.
+        """
+        self.frame_cache.invalidate()
+
+    def screenshot(self) -> np.ndarray:
+        """
+        Returns a read-only NumPy BGR image (OpenCV format) of the instance's screen.
+        Frames are shared for up to frame_cache_max_age seconds, or until the next input.
+        """
+        return self.frame_cache.get(self._screenshot_uncached)
+
+    def _screenshot_uncached(self) -> np.ndarray:
+        # Only re-verify connectivity after a failure, and no more than once per probe interval
+        if self.health.needs_verification():
+            if self.health.probe(self._is_connected) is False:
+                if DEBUG:
+                    print(f"[SCREENSHOT DEBUG] ADB connectivity probe failed: {self.health.stats()}")
+                raise RuntimeError(f"ADB connectivity test failed: {self.adb_serial} is not connected")
+
+        try:
+            return self._capture_screenshot()
+        except RuntimeError:
+            self.health.record_failure()
+            raise
+
+    def _capture_screenshot(self) -> np.ndarray:
+        if self.screenshot_mode == "raw":
+            # a single bad read (e.g. a truncated transfer) is retried, only a framebuffer that
+            # stays unreadable over several captures switches this controller to PNG for good
+            for attempt in range(2):
+                try:
+                    img = self._screenshot_raw()
+                    self.raw_failures = 0
+                    return img
+                except InvalidImageError as error:
+                    raw_error = error
+            self.raw_failures += 1
+            if self.raw_failures >= RAW_FAILURES_BEFORE_PNG:
+                self._log_screenshot_warning(
+                    f"[!] Raw screencap unusable ({raw_error.message}), falling back to PNG screenshots."
+                )
+                self.screenshot_mode = "png"
+        return self._screenshot_png()
+
+    def _screenshot_png(self) -> np.ndarray:
+        """
+        Captures a PNG with screencap -p and decodes it to a BGR image.
+        """
+        result = self._exec_out("screencap -p")
+        if result.returncode != 0:
+            error_msg = result.stderr if result.stderr else "Unknown error"
+            raise RuntimeError(f"ADB screenshot failed: {error_msg}")
+        if result.stdout is None:
+            raise RuntimeError("ADB screenshot returned None stdout - command failed silently")
+        if len(result.stdout) == 0:
+            raise RuntimeError("ADB screenshot returned empty data")
+
+        img = cv2.imdecode(np.frombuffer(result.stdout, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            if DEBUG:
+                with open("debug_screenshot_data.bin", "wb") as f:
+                    f.write(result.stdout)
+                print("[SCREENSHOT DEBUG] Raw screenshot data saved to debug_screenshot_data.bin")
+            raise ValueError("Failed to decode screenshot - image data may be corrupted")
+
+        if DEBUG:
+            print(f"[SCREENSHOT DEBUG] PNG screenshot successful! Image shape: {img.shape}")
+        return img
+
+    def _screenshot_raw(self) -> np.ndarray:
+        """
+        Captures the uncompressed framebuffer with screencap (no -p) and maps it to a BGR image.
+
+        :raises InvalidImageError: if the framebuffer cannot be parsed
+        """
+        result = self._exec_out("screencap")
+        if result.returncode != 0:
+            error_msg = result.stderr if result.stderr else "Unknown error"
+            raise RuntimeError(f"ADB screenshot failed: {error_msg}")
+        if len(result.stdout) < 16:
+            # too short to even hold a header: a failed transfer, not a sign the format is unsupported
+            raise RuntimeError(f"ADB screenshot returned truncated data ({len(result.stdout)} bytes)")
+
+        img = open_from_raw_framebuffer(result.stdout)
+        if DEBUG:
+            print(f"[SCREENSHOT DEBUG] Raw screenshot successful! Image shape: {img.shape}")
+        return img
@@ -0,0 +1,235 @@
+import re
+import select
+import socket
+import subprocess
+import threading
+
+ADB_SERVER_HOST = "127.0.0.1"
+ADB_SERVER_PORT = 5037
+
+
+class AdbTransportError(Exception):
+    """Exception raised when the adb server cannot service a request"""
+
+    def __init__(self, message: str, service: str | None = None, delivered: bool = False):
+        self.service = service
+        self.message = message
+        # the command reached the device before the failure, so running it again may repeat it
+        self.delivered = delivered
+        super().__init__(self.message)
+
+
+class AdbTransport:
+    """
+    Long-lived client for the adb server's smart-socket protocol.
+
+    Shell commands are multiplexed over one persistent ``exec:sh`` session, so a
+    tap costs a socket write instead of a process spawn. Binary ``exec-out``
+    commands and host queries open a short socket to the local adb server.
+    Dropped connections are re-opened transparently on the next call.
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        host: str = ADB_SERVER_HOST,
+        port: int = ADB_SERVER_PORT,
+        timeout: float = 30.0,
+    ):
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+        self._shell_sock: socket.socket | None = None
+        self._shell_buffer = b""
+        self._shell_lock = threading.Lock()
+        self._sequence = 0
+
+    # =========================================================================
+    # PROTOCOL HELPERS
+    # =========================================================================
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("adb server closed the connection")
+            data += chunk
+        return data
+
+    @staticmethod
+    def _recv_all(sock: socket.socket) -> bytes:
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def _send_request(self, sock: socket.socket, service: str):
+        """Sends one length-prefixed request and waits for OKAY"""
+        payload = service.encode("utf-8")
+        sock.sendall(f"{len(payload):04x}".encode("ascii") + payload)
+        status = self._recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            length = int(self._recv_exact(sock, 4), 16)
+            message = self._recv_exact(sock, length).decode("utf-8", errors="replace")
+            raise AdbTransportError(f"adb server refused '{service}': {message}", service=service)
+        raise AdbTransportError(f"Unexpected adb server response {status!r}", service=service)
+
+    def _open_service(self, service: str) -> socket.socket:
+        """Opens a socket bound to this transport's device and starts a service on it"""
+        sock = self._open_socket()
+        try:
+            self._send_request(sock, f"host:transport:{self.serial}")
+            self._send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    # =========================================================================
+    # PUBLIC COMMANDS
+    # =========================================================================
+
+    def host_service(self, service: str) -> subprocess.CompletedProcess:
+        """Runs a host service (e.g. ``host:devices``) on the adb server.
+
+        Args:
+            service: host service name, including the ``host:`` prefix
+
+        Returns:
+            subprocess.CompletedProcess: result with the decoded payload as stdout
+        """
+        try:
+            with self._open_socket() as sock:
+                self._send_request(sock, service)
+                length = int(self._recv_exact(sock, 4), 16)
+                payload = self._recv_exact(sock, length).decode("utf-8", errors="replace")
+        except OSError as error:
+            raise AdbTransportError(f"adb server unreachable: {error}", service=service) from error
+        return subprocess.CompletedProcess(service, 0, stdout=payload, stderr="")
+
+    def exec_out(self, command: str, binary_output: bool = True) -> subprocess.CompletedProcess:
+        """Runs a command on the device and returns its raw stdout.
+
+        Equivalent to ``adb exec-out <command>`` without spawning adb.exe.
+
+        Args:
+            command: device command line
+            binary_output: return stdout as bytes instead of text
+
+        Returns:
+            subprocess.CompletedProcess: result with the command output as stdout
+        """
+        service = f"exec:{command}"
+        try:
+            with self._open_service(service) as sock:
+                data = self._recv_all(sock)
+        except OSError as error:
+            raise AdbTransportError(f"adb exec failed: {error}", service=service) from error
+        if binary_output:
+            return subprocess.CompletedProcess(command, 0, stdout=data, stderr=b"")
+        return subprocess.CompletedProcess(command, 0, stdout=data.decode("utf-8", errors="replace"), stderr="")
+
+    def shell(self, command: str) -> subprocess.CompletedProcess:
+        """Runs a non-interactive shell command over the persistent session.
+
+        Each command runs in its own subshell, so ``cd`` or variables never leak
+        into the next one. If the session had dropped before the command was
+        sent, it is re-opened and the command sent once more. Once the command
+        was sent it is never sent again: a failure while reading its output
+        raises AdbTransportError with ``delivered`` set.
+
+        Args:
+            command: shell command line (stdin is redirected from /dev/null)
+
+        Returns:
+            subprocess.CompletedProcess: result with the command's exit status and text output
+        """
+        with self._shell_lock:
+            for attempt in range(2):
+                try:
+                    marker = self._send_shell_command(command)
+                except OSError as error:
+                    self._close_shell()
+                    if attempt == 1:
+                        raise AdbTransportError(f"adb shell session failed: {error}", service="exec:sh") from error
+                    continue
+
+                try:
+                    return self._read_shell_result(command, marker)
+                except TimeoutError as error:
+                    self._close_shell()
+                    raise AdbTransportError(
+                        f"adb shell command timed out: {command}", service="exec:sh", delivered=True
+                    ) from error
+                except OSError as error:
+                    self._close_shell()
+                    raise AdbTransportError(
+                        f"adb shell session lost while running: {command}", service="exec:sh", delivered=True
+                    ) from error
+
+    def _send_shell_command(self, command: str) -> str:
+        """Writes one command to the session, opening it first if needed. Returns its end marker."""
+        # a session the server dropped while idle is re-opened before anything is sent on it
+        if self._shell_sock is not None and not self._shell_alive():
+            self._close_shell()
+        if self._shell_sock is None:
+            self._shell_sock = self._open_service("exec:sh")
+            self._shell_buffer = b""
+
+        self._sequence += 1
+        marker = f"__CLASHBOT_ADB_DONE_{self._sequence}__"
+        line = f'( {command}\n) </dev/null\nprintf "\\n{marker} %d\\n" $?\n'
+        self._shell_sock.sendall(line.encode("utf-8"))
+        return marker
+
+    def _read_shell_result(self, command: str, marker: str) -> subprocess.CompletedProcess:
+        pattern = re.compile(rb"\n" + marker.encode("ascii") + rb" (\d+)\n")
+        while True:
+            match = pattern.search(self._shell_buffer)
+            if match is not None:
+                break
+            chunk = self._shell_sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("adb shell session closed")
+            self._shell_buffer += chunk
+
+        output = self._shell_buffer[: match.start()].decode("utf-8", errors="replace")
+        self._shell_buffer = self._shell_buffer[match.end() :]
+        return subprocess.CompletedProcess(command, int(match.group(1)), stdout=output, stderr="")
+
+    def _shell_alive(self) -> bool:
+        """Returns False if the idle session was closed by the other side"""
+        readable, _, _ = select.select([self._shell_sock], [], [], 0)
+        if not readable:
+            return True
+        try:
+            return bool(self._shell_sock.recv(1, socket.MSG_PEEK))
+        except OSError:
+            return False
+
+    def _close_shell(self):
+        if self._shell_sock is not None:
+            try:
+                self._shell_sock.close()
+            except OSError:
+                pass
+        self._shell_sock = None
+        self._shell_buffer = b""
+
+    def close(self):
+        """Closes the persistent shell session. The next command re-opens it."""
+        with self._shell_lock:
+            self._close_shell()
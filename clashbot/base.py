@@ -73,6 +73,12 @@ class BaseEmulatorController:
         """
         raise NotImplementedError
 
+    def invalidate_frame_cache(self):
+        """
+        This method is used to drop any cached screenshot so the next one is fresh.
+        Controllers without a frame cache can leave it as a no-op.
+        """
+
     def install_apk(self, apk_path: str):
         """
         This method is used to install an APK on the emulator.
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Callable
+
+
+class ConnectionHealth:
+    """
+    Tracks emulator connection liveness from the outcome of real commands.
+
+    Every command reports success or failure, so an explicit probe (e.g.
+    ``adb devices``) is only needed after a failure, and even then it is
+    rate-limited to one per ``probe_interval`` seconds. Counters are kept so
+    the probe rate can be checked in production.
+    """
+
+    def __init__(self, probe_interval: float = 5.0):
+        self.probe_interval = probe_interval
+
+        self.alive: bool | None = None  # None until the first command reports back
+        self.consecutive_failures = 0
+        self.last_success_time: float | None = None
+        self.last_probe_time: float | None = None
+
+        self.counters = {
+            "commands_ok": 0,
+            "commands_failed": 0,
+            "probes_fired": 0,
+            "probes_failed": 0,
+            "probes_skipped": 0,
+        }
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        """Marks the connection alive after a command completed"""
+        with self._lock:
+            self.alive = True
+            self.consecutive_failures = 0
+            self.last_success_time = time.monotonic()
+            self.counters["commands_ok"] += 1
+
+    def record_failure(self):
+        """Marks the connection suspect after a command failed"""
+        with self._lock:
+            self.alive = False
+            self.consecutive_failures += 1
+            self.counters["commands_failed"] += 1
+
+    def needs_verification(self) -> bool:
+        """Returns True if liveness is unknown or the last command failed"""
+        return self.alive is not True
+
+    def probe(self, check: Callable[[], bool], force: bool = False) -> bool | None:
+        """Runs an explicit liveness check unless one ran within probe_interval
+
+        Args:
+            check: callable returning True if the emulator is reachable
+            force: ignore the rate limit
+
+        Returns:
+            bool | None: result of the check, or None if the probe was rate-limited
+        """
+        now = time.monotonic()
+        with self._lock:
+            recent = self.last_probe_time is not None and now - self.last_probe_time < self.probe_interval
+            if recent and not force:
+                self.counters["probes_skipped"] += 1
+                return None
+            self.last_probe_time = now
+            self.counters["probes_fired"] += 1
+
+        connected = check()
+        with self._lock:
+            self.alive = connected
+            if connected:
+                self.consecutive_failures = 0
+                self.last_success_time = time.monotonic()
+            else:
+                self.consecutive_failures += 1
+                self.counters["probes_failed"] += 1
+        return connected
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the counters and current liveness"""
+        with self._lock:
+            return {
+                **self.counters,
+                "alive": self.alive,
+                "consecutive_failures": self.consecutive_failures,
+            }
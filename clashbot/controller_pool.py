@@ -0,0 +1,548 @@
+import multiprocessing
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+from adb_controller import AdbController
+from adb_transport import ADB_SERVER_HOST, ADB_SERVER_PORT
+from base import BaseEmulatorController
+
+# factory(serial) -> controller attached to that instance
+ControllerFactory = Callable[[str], BaseEmulatorController]
+
+
+class InstanceLogger:
+    """Bot logger that prefixes every line with the instance it came from"""
+
+    def __init__(self, serial: str, retry_interval: float = 30.0):
+        self.serial = serial
+        self.retry_interval = retry_interval
+
+    def log(self, message):
+        print(f"[{self.serial}] {message}")
+
+    def change_status(self, message):
+        print(f"[{self.serial}] {message}")
+
+    def show_temporary_action(self, message, action_text=None, callback=None):
+        """Print the message; with no button to press, the action's callback runs after retry_interval"""
+        print(f"[{self.serial}] {message}")
+        if callback is not None:
+            timer = threading.Timer(self.retry_interval, callback)
+            timer.daemon = True
+            timer.start()
+
+
+class AdbControllerFactory:
+    """Builds AdbController instances talking to one adb server. Picklable, so it works in worker processes."""
+
+    def __init__(self, host: str = ADB_SERVER_HOST, port: int = ADB_SERVER_PORT, frame_cache_max_age: float = 0.2):
+        self.host = host
+        self.port = port
+        self.frame_cache_max_age = frame_cache_max_age
+
+    def __call__(self, serial: str) -> BaseEmulatorController:
+        return AdbController(serial, host=self.host, port=self.port, frame_cache_max_age=self.frame_cache_max_age)
+
+
+class GooglePlayControllerFactory:
+    """
+    Builds GooglePlayEmulatorController instances that attach to their serial. Picklable, so it works in worker processes.
+
+    The controllers never kill, boot or reconfigure emulator processes: the
+    Google Play controller does that by image name, which would take down
+    every instance on the host. Boot instances through an InstanceLauncher.
+    """
+
+    def __init__(
+        self,
+        render_settings: dict | None = None,
+        frame_cache_max_age: float = 0.2,
+        adb_server_port: int = ADB_SERVER_PORT,
+    ):
+        self.render_settings = render_settings or {}
+        self.frame_cache_max_age = frame_cache_max_age
+        self.adb_server_port = adb_server_port
+
+    def __call__(self, serial: str) -> BaseEmulatorController:
+        # google_play needs winreg, so only import it when a controller is actually built
+        from google_play import GooglePlayEmulatorController
+
+        return GooglePlayEmulatorController(
+            InstanceLogger(serial),
+            render_settings=self.render_settings,
+            frame_cache_max_age=self.frame_cache_max_age,
+            adb_serial=serial,
+            owns_processes=False,
+            adb_server_port=self.adb_server_port,
+        )
+
+
+class InstanceLauncher:
+    """
+    Boots and stops the emulator instances of a ControllerPool, one process tree per serial.
+
+    ``commands`` maps a serial to the command line that runs its instance in
+    the foreground for as long as it is up, e.g. ``["emulator", "-avd",
+    "Pixel_2", "-port", "5556"]`` for ``emulator-5556``. The launcher keeps
+    the process it started for each serial and stops an instance by killing
+    that process tree by PID, never by image name, so stopping or restarting
+    one instance leaves every other instance on the host running.
+    """
+
+    def __init__(self, commands: dict[str, list[str]], stop_timeout: float = 10.0):
+        self.commands = {serial: list(command) for serial, command in commands.items()}
+        self.stop_timeout = stop_timeout
+
+        self._processes: dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, serial: str):
+        return serial in self.commands
+
+    def is_running(self, serial: str) -> bool:
+        """Whether the process started for an instance is still alive"""
+        process = self._processes.get(serial)
+        return process is not None and process.poll() is None
+
+    def start(self, serial: str) -> int:
+        """Boot an instance unless its process is already running
+
+        Returns:
+            int: PID of the instance's process
+
+        Raises:
+            KeyError: if there is no command for the serial
+        """
+        with self._lock:
+            process = self._processes.get(serial)
+            if process is None or process.poll() is not None:
+                # its own process group, so the whole tree can be stopped without touching anything else
+                if os.name == "nt":
+                    group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+                else:
+                    group = {"start_new_session": True}
+                process = subprocess.Popen(
+                    self.commands[serial], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **group
+                )
+                self._processes[serial] = process
+            return process.pid
+
+    def stop(self, serial: str):
+        """Kill the process tree started for an instance, if it is running"""
+        with self._lock:
+            process = self._processes.pop(serial, None)
+        if process is None or process.poll() is not None:
+            return
+        if os.name == "nt":
+            subprocess.run(f"taskkill /f /t /pid {process.pid}", shell=True, capture_output=True, check=False)
+        else:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        try:
+            process.wait(timeout=self.stop_timeout)
+        except subprocess.TimeoutExpired:
+            print(f"[!] Warning: instance {serial} (PID {process.pid}) did not exit after being killed")
+
+    def restart(self, serial: str) -> int:
+        """Stop an instance if it is running, then boot it again"""
+        self.stop(serial)
+        return self.start(serial)
+
+    def stop_all(self):
+        """Stop every instance this launcher started"""
+        for serial in list(self._processes):
+            self.stop(serial)
+
+
+@dataclass
+class PoolInstance:
+    """One emulator instance in a ControllerPool and its usage counters"""
+
+    serial: str
+    controller: BaseEmulatorController | None = None
+    busy: bool = False
+    tasks: int = 0
+    failures: int = 0
+    busy_seconds: float = 0.0
+
+
+class ControllerPool:
+    """
+    Controllers for several emulator instances on one host, keyed by adb serial.
+
+    Controllers are built lazily by ``factory(serial)`` the first time their
+    instance is acquired, and only attach to their own serial. Booting and
+    restarting instances is the pool's job: with a ``launcher`` (see
+    InstanceLauncher) start() boots every instance that is not running yet
+    and restart() reboots just one, by the processes it started for that
+    serial, so restarting one account never takes down the others.
+
+    acquire() hands out an idle controller for exclusive use, preferring the
+    instance that has been busy the least, and blocks while every candidate
+    is in use.
+    """
+
+    def __init__(
+        self,
+        factory: ControllerFactory,
+        serials: list[str] = (),
+        launcher: InstanceLauncher | None = None,
+        boot_timeout: float = 300.0,
+    ):
+        self.factory = factory
+        self.launcher = launcher
+        self.boot_timeout = boot_timeout
+        self.instances: dict[str, PoolInstance] = {}
+        self._condition = threading.Condition()
+        for serial in serials:
+            self.add(serial)
+
+    def __len__(self):
+        return len(self.instances)
+
+    def __contains__(self, serial: str):
+        return serial in self.instances
+
+    def serials(self) -> list[str]:
+        return list(self.instances)
+
+    def add(self, serial: str) -> PoolInstance:
+        """Register an instance
+
+        Raises:
+            ValueError: if the serial is already pooled
+        """
+        with self._condition:
+            if serial in self.instances:
+                raise ValueError(f"Instance {serial} is already in the pool")
+            instance = PoolInstance(serial)
+            self.instances[serial] = instance
+            self._condition.notify_all()
+        return instance
+
+    def remove(self, serial: str):
+        """Stop an idle instance's controller and drop it from the pool
+
+        Raises:
+            ValueError: if the instance is in use
+        """
+        with self._condition:
+            instance = self.instances.get(serial)
+            if instance is None:
+                return
+            if instance.busy:
+                raise ValueError(f"Instance {serial} is in use")
+            del self.instances[serial]
+        self._stop(instance)
+
+    def get(self, serial: str) -> BaseEmulatorController:
+        """Controller of an instance, built if needed. Prefer acquire() for exclusive use."""
+        instance = self.instances[serial]
+        if instance.controller is None:
+            instance.controller = self.factory(instance.serial)
+        return instance.controller
+
+    def _pick(self, serial: str | None) -> PoolInstance | None:
+        if serial is not None:
+            instance = self.instances.get(serial)
+            if instance is None:
+                raise KeyError(f"Instance {serial} is not in the pool")
+            return None if instance.busy else instance
+        idle = [instance for instance in self.instances.values() if not instance.busy]
+        if not idle:
+            return None
+        return min(idle, key=lambda instance: (instance.busy_seconds, instance.tasks))
+
+    @contextmanager
+    def reserve(self, serial: str | None = None, timeout: float | None = None):
+        """Exclusive use of one instance, without building its controller here
+
+        For work that drives the instance from elsewhere (e.g. a worker process
+        with its own controller); usage is counted exactly as for acquire().
+
+        Args:
+            serial: instance to use, or None for the least busy idle one
+            timeout: seconds to wait for an instance to free up, None waits forever
+
+        Yields:
+            PoolInstance: the reserved instance
+
+        Raises:
+            TimeoutError: if no instance freed up in time
+        """
+        with self._condition:
+            instance = None
+            if self._condition.wait_for(lambda: self._pick(serial) is not None, timeout):
+                instance = self._pick(serial)
+            if instance is None:
+                raise TimeoutError(f"No idle instance{'' if serial is None else ' ' + serial} after {timeout}s")
+            instance.busy = True
+
+        started = time.monotonic()
+        failed = False
+        try:
+            yield instance
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._condition:
+                instance.busy = False
+                instance.tasks += 1
+                instance.failures += failed
+                instance.busy_seconds += time.monotonic() - started
+                self._condition.notify_all()
+
+    @contextmanager
+    def acquire(self, serial: str | None = None, timeout: float | None = None):
+        """Exclusive use of one instance's controller
+
+        Args:
+            serial: instance to use, or None for the least busy idle one
+            timeout: seconds to wait for an instance to free up, None waits forever
+
+        Yields:
+            BaseEmulatorController: the instance's controller
+
+        Raises:
+            TimeoutError: if no instance freed up in time
+        """
+        with self.reserve(serial, timeout) as instance:
+            yield self.get(instance.serial)
+
+    def stats(self) -> dict[str, dict]:
+        """Usage counters per instance"""
+        with self._condition:
+            return {
+                serial: {
+                    "busy": instance.busy,
+                    "tasks": instance.tasks,
+                    "failures": instance.failures,
+                    "busy_seconds": instance.busy_seconds,
+                }
+                for serial, instance in self.instances.items()
+            }
+
+    @staticmethod
+    def _stop(instance: PoolInstance):
+        if instance.controller is None:
+            return
+        try:
+            instance.controller.stop()
+        except Exception as e:
+            print(f"[!] Warning: could not stop controller for {instance.serial}: {e}")
+        instance.controller = None
+
+    def start(self):
+        """Boot every pooled instance the launcher has a command for and that is not running yet"""
+        if self.launcher is None:
+            return
+        for serial in self.serials():
+            if serial in self.launcher:
+                self.launcher.start(serial)
+
+    def restart(self, serial: str, timeout: float | None = None) -> bool:
+        """Reboot one instance and reattach its controller, holding the instance like acquire()
+
+        Only this instance's processes are restarted, through the launcher; without a
+        launcher (or a command for the serial) its controller just reattaches.
+
+        Args:
+            serial: instance to restart
+            timeout: seconds to wait for the instance to free up, None waits forever
+
+        Returns:
+            bool: True if the controller reattached within boot_timeout
+        """
+        with self.reserve(serial, timeout) as instance:
+            if self.launcher is not None and serial in self.launcher:
+                self.launcher.restart(serial)
+            controller = self.get(instance.serial)
+            deadline = time.monotonic() + self.boot_timeout
+            while not controller.restart():
+                if time.monotonic() > deadline:
+                    return False
+                time.sleep(1)
+            return True
+
+    def close(self, stop_instances: bool = False):
+        """Stop every controller. The pool can still be used afterwards, controllers are rebuilt on demand.
+
+        Args:
+            stop_instances: also stop the instances the launcher booted
+        """
+        with self._condition:
+            instances = list(self.instances.values())
+        for instance in instances:
+            self._stop(instance)
+        if stop_instances and self.launcher is not None:
+            self.launcher.stop_all()
+
+
+# The one instance a worker process drives, see TaskScheduler(processes=True)
+_worker_instance: tuple[ControllerFactory, str] | None = None
+_worker_controller: BaseEmulatorController | None = None
+
+
+def _init_process_worker(factory: ControllerFactory, serial: str):
+    global _worker_instance
+    _worker_instance = (factory, serial)
+
+
+def _run_in_process_worker(task: Callable, args: tuple, kwargs: dict):
+    """Run a task on this worker's controller, building it on first use so factory errors reach the caller"""
+    global _worker_controller
+    if _worker_controller is None:
+        factory, serial = _worker_instance
+        _worker_controller = factory(serial)
+    return task(_worker_controller, *args, **kwargs)
+
+
+def _stop_process_worker():
+    global _worker_controller
+    if _worker_controller is not None:
+        _worker_controller.stop()
+        _worker_controller = None
+
+
+class TaskScheduler:
+    """
+    Spreads bot tasks over the instances of a ControllerPool.
+
+    A task is any callable taking a controller as its first argument, e.g. one
+    account's bot loop. Every instance runs one task at a time and queued
+    tasks go to whichever instance frees up first; a task submitted with a
+    serial waits for that instance only, without holding up the others.
+    Either way the instance is held through the pool, so its busy flag and
+    usage stats cover every task.
+
+    By default tasks run on the pool's controllers in a thread per instance.
+    With ``processes=True`` each instance gets a dedicated worker process
+    instead, which builds its own controller with the pool's factory, so
+    CPU-bound recognition on one instance does not hold the GIL for the rest.
+    Tasks, their arguments and the factory must then be picklable, and the
+    worker controllers are stopped on shutdown().
+    """
+
+    def __init__(self, pool: ControllerPool, processes: bool = False):
+        self.pool = pool
+        self.processes = processes
+
+        self._pending: deque = deque()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._serials = pool.serials()
+        self._threads: list[threading.Thread] = []
+        self._executors: dict[str, ProcessPoolExecutor] = {}
+
+        if processes:
+            # spawn, as on Windows: forking a process that already runs adb threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            for serial in self._serials:
+                self._executors[serial] = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_process_worker,
+                    initargs=(pool.factory, serial),
+                )
+
+        for serial in self._serials:
+            thread = threading.Thread(target=self._instance_loop, args=(serial,), name=f"TaskScheduler-{serial}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, task: Callable, *args, serial: str | None = None, **kwargs) -> Future:
+        """Queue ``task(controller, *args, **kwargs)``
+
+        Args:
+            task: callable taking the controller first
+            serial: instance to run on, or None for the first free one
+
+        Returns:
+            Future: resolves to the task's return value
+        """
+        if self._shutdown:
+            raise RuntimeError("Cannot submit tasks after shutdown")
+        if serial is not None and serial not in self._serials:
+            raise KeyError(f"Instance {serial} was not in the pool when the scheduler started")
+
+        future = Future()
+        with self._condition:
+            self._pending.append((future, task, args, kwargs, serial))
+            self._condition.notify_all()
+        return future
+
+    def map(self, task: Callable, items) -> list:
+        """Run ``task(controller, item)`` for every item, returning the results in order"""
+        futures = [self.submit(task, item) for item in items]
+        return [future.result() for future in futures]
+
+    def _next_task(self, serial: str):
+        for index, item in enumerate(self._pending):
+            if item[4] is None or item[4] == serial:
+                del self._pending[index]
+                return item
+        return None
+
+    def _run(self, serial: str, task: Callable, args: tuple, kwargs: dict):
+        executor = self._executors.get(serial)
+        if executor is None:
+            with self.pool.acquire(serial) as controller:
+                return task(controller, *args, **kwargs)
+        with self.pool.reserve(serial):
+            return executor.submit(_run_in_process_worker, task, args, kwargs).result()
+
+    def _instance_loop(self, serial: str):
+        while True:
+            with self._condition:
+                item = None
+                while item is None:
+                    item = self._next_task(serial)
+                    if item is None:
+                        if self._shutdown:
+                            return
+                        self._condition.wait()
+
+            future, task, args, kwargs, _ = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = self._run(serial, task, args, kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True):
+        """Stop taking tasks; queued tasks still run. Blocks until they finish if ``wait``.
+
+        Worker processes stop their controllers and exit once their queued tasks are done.
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        for serial, executor in self._executors.items():
+            stopped = executor.submit(_stop_process_worker)
+            executor.shutdown(wait=wait)
+            if wait and stopped.exception() is not None:
+                print(f"[!] Warning: could not stop controller for {serial}: {stopped.exception()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
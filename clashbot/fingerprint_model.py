@@ -0,0 +1,126 @@
+import ast
+import csv
+import os
+from pathlib import Path
+
+import numpy as np
+
+FINGERPRINT_CSV = str(Path(__file__).parent.parent / "data" / "models" / "page_rec_pixels.csv")
+
+
+class FingerprintModel:
+    """
+    Binary form of page_rec_pixels.csv.
+
+    Every label's [x, y, b, g, r] rows are stored back to back in one int16
+    array, with a label index of offsets into it, and saved as an .npz next
+    to the CSV. Loading it is a single read with no Python literal parsing.
+    The CSV stays the editable source: tools/pixel_extractor.py appends to it
+    and load_fingerprints() rebuilds the .npz whenever the CSV is newer.
+    """
+
+    def __init__(self, labels: list[str], pixels: np.ndarray, offsets: np.ndarray):
+        self.labels = list(labels)
+        self.pixels = np.asarray(pixels, dtype=np.int16).reshape(-1, 5)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.index = {label: position for position, label in enumerate(self.labels)}
+
+    @classmethod
+    def from_dict(cls, pixel_references: dict[str, list[list[int]]]) -> "FingerprintModel":
+        """Build a model from {label: [[x, y, b, g, r], ...]}"""
+        labels = list(pixel_references)
+        rows = [pixel for label in labels for pixel in pixel_references[label]]
+        counts = [len(pixel_references[label]) for label in labels]
+        return cls(labels, np.asarray(rows, dtype=np.int16), np.concatenate([[0], np.cumsum(counts)]))
+
+    @classmethod
+    def from_csv(cls, path: str = FINGERPRINT_CSV) -> "FingerprintModel":
+        """Parse page_rec_pixels.csv; a label listed twice keeps its last row"""
+        pixel_references = {}
+        if os.path.exists(path):
+            with open(path, "r", newline="") as pixel_file:
+                for row in csv.reader(pixel_file):
+                    if row and len(row) >= 2:
+                        pixel_references[row[0]] = ast.literal_eval(row[1])
+        return cls.from_dict(pixel_references)
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintModel":
+        """Load a model written by save()"""
+        with np.load(path, allow_pickle=False) as model:
+            return cls(model["labels"].tolist(), model["pixels"], model["offsets"])
+
+    def save(self, path: str):
+        """Write the model as an .npz, replacing any existing file atomically"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as model_file:
+            np.savez(
+                model_file,
+                labels=np.asarray(self.labels, dtype=str),
+                pixels=self.pixels,
+                offsets=self.offsets,
+            )
+        os.replace(temporary, path)
+
+    def to_csv(self, path: str = FINGERPRINT_CSV):
+        """Write the model back in the page_rec_pixels.csv format, replacing any existing file atomically"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", newline="") as pixel_file:
+            writer = csv.writer(pixel_file)
+            for label in self.labels:
+                writer.writerow([label, str(self.label_pixels(label))])
+        os.replace(temporary, path)
+
+    def label_pixels(self, label: str) -> list[list[int]]:
+        """Returns the [x, y, b, g, r] rows of a label, or an empty list if it has none"""
+        position = self.index.get(label)
+        if position is None:
+            return []
+        return self.pixels[self.offsets[position] : self.offsets[position + 1]].tolist()
+
+    def set_label_pixels(self, label: str, pixels: list[list[int]]):
+        """Replace (or add) the rows of one label"""
+        pixel_references = self.as_dict()
+        pixel_references[label] = pixels
+        updated = FingerprintModel.from_dict(pixel_references)
+        self.labels, self.pixels, self.offsets, self.index = (
+            updated.labels,
+            updated.pixels,
+            updated.offsets,
+            updated.index,
+        )
+
+    def as_dict(self) -> dict[str, list[list[int]]]:
+        """Returns {label: [[x, y, b, g, r], ...]} in label order"""
+        return {label: self.label_pixels(label) for label in self.labels}
+
+
+def model_path_for(csv_path: str) -> str:
+    """Returns the .npz path kept next to a fingerprint CSV"""
+    return os.path.splitext(csv_path)[0] + ".npz"
+
+
+def load_fingerprints(csv_path: str = FINGERPRINT_CSV, model_path: str | None = None) -> FingerprintModel:
+    """Load the fingerprints, converting the CSV to .npz first if the model is missing or stale
+
+    Args:
+        csv_path: editable fingerprint CSV
+        model_path: binary model, defaults to the CSV path with an .npz suffix
+
+    Returns:
+        FingerprintModel: the current fingerprints
+    """
+    model_path = model_path or model_path_for(csv_path)
+    csv_mtime = os.stat(csv_path).st_mtime_ns if os.path.exists(csv_path) else None
+    model_mtime = os.stat(model_path).st_mtime_ns if os.path.exists(model_path) else None
+
+    if model_mtime is not None and (csv_mtime is None or model_mtime >= csv_mtime):
+        return FingerprintModel.load(model_path)
+
+    model = FingerprintModel.from_csv(csv_path)
+    if csv_mtime is not None:
+        try:
+            model.save(model_path)
+        except OSError as e:
+            print(f"[!] Warning: could not write fingerprint model {model_path}: {e}")
+    return model
@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+
+class FrameCache:
+    """
+    Short-lived cache for the last captured frame.
+
+    Every check within one decision tick reads the same frame instead of
+    capturing its own. Frames expire after ``max_age`` seconds and must be
+    invalidated explicitly after any input that changes the screen
+    (click, swipe, app launch). Cached frames are read-only because they are
+    shared between callers.
+    """
+
+    def __init__(self, max_age: float = 0.2):
+        self.max_age = max_age
+
+        self._frame: np.ndarray | None = None
+        self._captured_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, capture: Callable[[], np.ndarray]) -> np.ndarray:
+        """Returns the cached frame, or captures and caches a new one if it is stale
+
+        Args:
+            capture: callable that captures a fresh frame
+
+        Returns:
+            np.ndarray: read-only frame no older than max_age
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._frame is not None and now - self._captured_at <= self.max_age:
+                self.hits += 1
+                return self._frame
+
+            frame = capture()
+            frame.flags.writeable = False
+            self.misses += 1
+            if self.max_age > 0:
+                self._frame = frame
+                self._captured_at = time.monotonic()
+            return frame
+
+    def invalidate(self):
+        """Drops the cached frame so the next read captures a fresh one"""
+        with self._lock:
+            self._frame = None
+
+    def stats(self) -> dict:
+        """Returns hit and miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,93 @@
+import cv2
+import numpy as np
+
+# the hash is a difference hash over a HASH_SIZE x HASH_SIZE grayscale thumbnail
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+def frame_hash(frame: np.ndarray, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """Compute a perceptual difference hash of a frame
+
+    The frame is shrunk to a (hash_size + 1) x hash_size grayscale thumbnail and
+    each bit records whether a pixel is brighter than its right neighbour, so
+    the hash ignores compression noise and small brightness shifts.
+
+    Args:
+        frame: BGR or RGB frame (the channel order only needs to be consistent)
+        hash_size: thumbnail rows; the hash has hash_size * hash_size bits
+
+    Returns:
+        np.ndarray: packed hash bits as uint8
+    """
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(np.ascontiguousarray(frame[:, :, :3]), cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return np.packbits(thumbnail[:, 1:] > thumbnail[:, :-1])
+
+
+def hamming_distances(hashes: np.ndarray, frame_hash_bits: np.ndarray) -> np.ndarray:
+    """Number of differing bits between one hash and each row of a hash matrix"""
+    return np.bitwise_count(np.bitwise_xor(hashes, frame_hash_bits)).sum(axis=1, dtype=np.int32)
+
+
+class DedupIndex:
+    """
+    Index of frame hashes for dropping near-identical frames.
+
+    Two frames are duplicates when their hashes differ in at most
+    ``threshold`` bits. Lookups compare against every stored hash at once,
+    optionally only the most recent ``window`` of them.
+    """
+
+    def __init__(self, threshold: int = 4, window: int | None = None, hash_size: int = HASH_SIZE):
+        self.threshold = threshold
+        self.window = window
+        self.hash_size = hash_size
+
+        self._hashes = np.zeros((64, hash_size * hash_size // 8), dtype=np.uint8)
+        self.keys: list = []
+
+        self.checked = 0
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, hash_bits: np.ndarray):
+        """Returns the key of the closest stored duplicate of a hash, or None"""
+        count = len(self.keys)
+        start = max(0, count - self.window) if self.window else 0
+        if count == start:
+            return None
+        distances = hamming_distances(self._hashes[start:count], hash_bits)
+        closest = int(np.argmin(distances))
+        if distances[closest] > self.threshold:
+            return None
+        return self.keys[start + closest]
+
+    def add(self, hash_bits: np.ndarray, key):
+        """Store a hash under a key"""
+        count = len(self.keys)
+        if count == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+        self._hashes[count] = hash_bits
+        self.keys.append(key)
+
+    def check(self, frame: np.ndarray, key=None):
+        """Check a frame against the index, storing it if it is new
+
+        Args:
+            frame: frame to check
+            key: key stored with the frame if it is new, defaults to its position in the index
+
+        Returns:
+            key of the earlier frame it duplicates, or None if it was new and has been stored
+        """
+        hash_bits = frame_hash(frame, self.hash_size)
+        self.checked += 1
+        duplicate = self.find(hash_bits)
+        if duplicate is not None:
+            self.duplicates += 1
+            return duplicate
+        self.add(hash_bits, len(self.keys) if key is None else key)
+        return None
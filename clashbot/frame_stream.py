@@ -0,0 +1,232 @@
+import shutil
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+try:
+    import av
+except ImportError:  # optional dependency, only needed for streaming capture
+    av = None
+
+from adb_transport import ADB_SERVER_HOST, ADB_SERVER_PORT
+from base import BaseEmulatorController
+
+DEBUG = False
+
+
+class FrameStream(BaseEmulatorController):
+    """
+    Streaming frame source built on ``adb exec-out screenrecord``.
+
+    A background thread decodes the continuous H.264 stream on the CPU with
+    PyAV and publishes only the newest frame. Publishing is a single reference
+    swap, so readers never take a lock and screenshot() returns immediately.
+    Input (click, swipe, apps) is delegated to the wrapped controller, and
+    frames decoded before the last input are never served afterwards.
+    """
+
+    def __init__(
+        self,
+        controller: BaseEmulatorController,
+        command: list[str] | None = None,
+        bit_rate: int = 8_000_000,
+        first_frame_timeout: float = 5.0,
+        restart_delay: float = 0.5,
+        max_frame_age: float = 1.0,
+    ):
+        if av is None:
+            raise ImportError("FrameStream requires PyAV, install it with 'pip install av'")
+
+        self.controller = controller
+        self.command = command or self._screenrecord_command(controller, bit_rate)
+        self.first_frame_timeout = first_frame_timeout
+        self.restart_delay = restart_delay
+        self.max_frame_age = max_frame_age
+
+        # (frame, sequence number, monotonic decode time), replaced wholesale by the decoder
+        self._latest: tuple[np.ndarray, int, float] | None = None
+        self._first_frame = threading.Event()
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._process: subprocess.Popen | None = None
+        self.frames_decoded = 0
+        self.stream_restarts = 0
+        # lowest sequence number screenshot() may serve, raised past the current frame by every input
+        self._min_sequence = 0
+
+    @staticmethod
+    def _screenrecord_command(controller: BaseEmulatorController, bit_rate: int) -> list[str]:
+        """adb screenrecord command line for the controller's instance, on the controller's adb server
+
+        Uses the controller's adb_path, or adb from PATH for controllers without one (AdbController).
+        """
+        adb_path = getattr(controller, "adb_path", None) or shutil.which("adb")
+        if adb_path is None:
+            raise FileNotFoundError("FrameStream needs adb on PATH to run screenrecord for this controller")
+
+        command = [adb_path]
+        transport = getattr(controller, "transport", None)
+        if transport is not None and transport.host != ADB_SERVER_HOST:
+            command += ["-H", transport.host]
+        if transport is not None and transport.port != ADB_SERVER_PORT:
+            command += ["-P", str(transport.port)]
+        return command + [
+            "-s",
+            controller.adb_serial,
+            "exec-out",
+            "screenrecord",
+            "--output-format=h264",
+            f"--bit-rate={bit_rate}",
+            "-",
+        ]
+
+    # =========================================================================
+    # STREAM LIFECYCLE
+    # =========================================================================
+
+    def start(self):
+        """
+        Starts the background decoder. Does nothing if it is already running.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, name="FrameStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background decoder and the screenrecord process.
+        The wrapped controller is left running.
+        """
+        self._running = False
+        self._kill_process()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def restart(self):
+        """
+        Restarts the stream, discarding the last published frame.
+        """
+        self.stop()
+        self._latest = None
+        self._first_frame.clear()
+        self.start()
+
+    def _kill_process(self):
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _decode_loop(self):
+        # screenrecord exits on its own after its time limit, so keep re-spawning it
+        while self._running:
+            try:
+                self._decode_stream()
+            except Exception as error:  # pylint: disable=broad-except
+                if DEBUG:
+                    print(f"[STREAM DEBUG] Decoder stopped: {error}")
+            finally:
+                self._kill_process()
+            # the next session must not start by serving this one's last frame
+            self._latest = None
+            if self._running:
+                self.stream_restarts += 1
+                time.sleep(self.restart_delay)
+
+    def _decode_stream(self):
+        self._process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        with av.open(self._process.stdout, format="h264", mode="r") as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            for frame in container.decode(stream):
+                if not self._running:
+                    return
+                image = frame.to_ndarray(format="bgr24")
+                image.flags.writeable = False
+                self.frames_decoded += 1
+                self._latest = (image, self.frames_decoded, time.monotonic())
+                self._first_frame.set()
+
+    # =========================================================================
+    # FRAME ACCESS
+    # =========================================================================
+
+    def latest(self) -> tuple[np.ndarray, int, float] | None:
+        """Returns the newest (frame, sequence, decode time) or None before the first frame"""
+        return self._latest
+
+    def frame_age(self) -> float | None:
+        """Returns seconds since the newest frame was decoded, or None before the first frame"""
+        latest = self._latest
+        return None if latest is None else time.monotonic() - latest[2]
+
+    def screenshot(self) -> np.ndarray:
+        """
+        Returns the freshest decoded frame as a read-only BGR image.
+
+        Falls back to the wrapped controller if the stream has not produced a frame in time,
+        is re-spawning, its newest frame is older than max_frame_age (screenrecord only
+        emits frames when the screen changes, and a dead stream must not serve a frozen image),
+        or no frame has been decoded since the last input.
+        """
+        latest = self._latest
+        if latest is None:
+            if not self._running:
+                self.start()
+            # only the very first frame is worth waiting for, a re-spawning stream is read around
+            if self.frames_decoded or not self._first_frame.wait(self.first_frame_timeout):
+                return self.controller.screenshot()
+            latest = self._latest
+        if latest is None or latest[1] < self._min_sequence or time.monotonic() - latest[2] > self.max_frame_age:
+            return self.controller.screenshot()
+        return latest[0]
+
+    def invalidate_frame_cache(self):
+        """
+        Stops serving frames decoded so far, and drops the wrapped controller's cached screenshot.
+        """
+        self._min_sequence = self.frames_decoded + 1
+        self.controller.invalidate_frame_cache()
+
+    # =========================================================================
+    # DELEGATED CONTROLS
+    # =========================================================================
+
+    def create(self):
+        return self.controller.create()
+
+    def configure(self):
+        return self.controller.configure()
+
+    def click(self, x_coord: int, y_coord: int, clicks: int = 1, interval: float = 0.0):
+        result = self.controller.click(x_coord, y_coord, clicks, interval)
+        self.invalidate_frame_cache()
+        return result
+
+    def swipe(
+        self,
+        x_coord1: int,
+        y_coord1: int,
+        x_coord2: int,
+        y_coord2: int,
+    ):
+        result = self.controller.swipe(x_coord1, y_coord1, x_coord2, y_coord2)
+        self.invalidate_frame_cache()
+        return result
+
+    def install_apk(self, apk_path: str):
+        return self.controller.install_apk(apk_path)
+
+    def start_app(self, package_name: str):
+        result = self.controller.start_app(package_name)
+        self.invalidate_frame_cache()
+        return result
@@ -6,15 +6,22 @@ from contextlib import suppress
 from os.path import normpath
 from winreg import HKEY_LOCAL_MACHINE, ConnectRegistry, OpenKey, QueryValueEx
 
-import cv2
-import numpy as np
 import pygetwindow as gw
 
 DEBUG = False
 
+from adb_screenshot import AdbScreenshotMixin
+from adb_transport import ADB_SERVER_PORT, AdbTransport, AdbTransportError
 from base import BaseEmulatorController
+from connection_health import ConnectionHealth
 from image_rec import *
+from poll_backoff import PollBackoff
 
+# the Google Play Games emulator always exposes adb on this port
+DEFAULT_ADB_SERIAL = "localhost:6520"
+
+# adb commands served by the adb server itself rather than a device, these never take -s
+HOST_COMMANDS = ("connect", "disconnect", "devices", "start-server", "kill-server", "version")
 
 
 def check_if_on_clash_main_menu(emulator) -> bool:
@@ -22,15 +29,12 @@ def check_if_on_clash_main_menu(emulator) -> bool:
     Returns True if on main menu, False if not.
     """
     image = emulator.screenshot()
-    pixels = [
-        image[14][209],  # white
-        image[14][325],  # white
-        image[19][298],  # yellow
-        image[17][399],  # green
-        image[581][261],  # green
-        image[584][166],  # bluegrey
-        image[621][166],  # bluegrey
-    ]
+    pixels = sample_pixels(
+        image,
+        xs=[209, 325, 298, 399, 261, 166, 166],
+        ys=[14, 14, 19, 17, 581, 584, 621],
+        rgb=False,
+    )  # white, white, yellow, green, green, bluegrey, bluegrey
 
     # google play colors
     colors_1 = [
@@ -66,13 +70,38 @@ def check_if_on_clash_main_menu(emulator) -> bool:
 
 
 
-class GooglePlayEmulatorController(BaseEmulatorController):
-    def __init__(self, logger, render_settings: dict = {}):
+class GooglePlayEmulatorController(AdbScreenshotMixin, BaseEmulatorController):
+    def __init__(
+        self,
+        logger,
+        render_settings: dict = {},
+        frame_cache_max_age: float = 0.2,
+        adb_serial: str = DEFAULT_ADB_SERIAL,
+        owns_processes: bool = True,
+        adb_server_port: int = ADB_SERVER_PORT,
+    ):
+        """
+        Args:
+            logger: bot logger (log / change_status)
+            render_settings: EmulatorGpuGuestAngle settings written to the service config
+            frame_cache_max_age: seconds a screenshot is shared between recognizers
+            adb_serial: adb serial of the instance this controller drives
+            owns_processes: whether this controller may kill, boot and configure the emulator
+                processes. Those are killed by image name, taking down every instance on the
+                host, so pooled controllers (see ControllerPool) never own them: they only
+                attach to their own serial, and the pool's InstanceLauncher boots instances.
+            adb_server_port: port of the adb server used for this instance
+        """
         self.logger = logger
+        self.adb_serial = adb_serial
+        self.owns_processes = owns_processes
+        self.adb_server_port = adb_server_port
+
         # clear existing stuff
-        self.stop()
-        while self._is_emulator_running():
+        if self.owns_processes:
             self.stop()
+            while self._is_emulator_running():
+                self.stop()
 
         # search for base installation folder
         self.base_folder = self._find_install_location()
@@ -103,8 +132,15 @@ class GooglePlayEmulatorController(BaseEmulatorController):
             elif DEBUG:
                 print(f"[INIT DEBUG] Path verified: {path}")
 
-        # configure the emulator via file
-        self._configure_settings(render_settings)
+        # persistent connection to the adb server, falls back to adb.exe when unavailable
+        self.transport = AdbTransport(self.adb_serial, port=self.adb_server_port)
+        self.health = ConnectionHealth(probe_interval=5.0)
+
+        self._init_screenshots(frame_cache_max_age)
+
+        # configure the emulator via file, the config is shared by every instance on this host
+        if self.owns_processes:
+            self._configure_settings(render_settings)
 
         # emulator config
         self.google_play_emulator_process_name = "Google Play Games on PC Emulator"
@@ -217,13 +253,13 @@ class GooglePlayEmulatorController(BaseEmulatorController):
 
         if DEBUG:
             print("[CONNECT DEBUG] Disconnecting any existing connections...")
-        disconnect_result = self.adb("disconnect localhost:6520")
+        disconnect_result = self.adb(f"disconnect {self.adb_serial}")
         if DEBUG:
             print(f"[CONNECT DEBUG] Disconnect result: {disconnect_result.stdout}")
 
         if DEBUG:
-            print("[CONNECT DEBUG] Attempting to connect to localhost:6520...")
-        connect_result = self.adb("connect localhost:6520")
+            print(f"[CONNECT DEBUG] Attempting to connect to {self.adb_serial}...")
+        connect_result = self.adb(f"connect {self.adb_serial}")
         if DEBUG:
             print(f"[CONNECT DEBUG] Connect result: {connect_result.stdout}")
             print(f"[CONNECT DEBUG] Connect return code: {connect_result.returncode}")
@@ -242,12 +278,14 @@ class GooglePlayEmulatorController(BaseEmulatorController):
                 print("[CONNECT DEBUG] Devices command returned None stdout")
             return False
 
-        if "offline" in result.stdout:
-            self.logger.log("[!] Emulator is offline. Please check the connection.")
+        # other instances on this host show up in the same list, only our own line matters
+        state = self._device_state(result.stdout)
+        if state == "offline":
+            self.logger.log(f"[!] Emulator {self.adb_serial} is offline. Please check the connection.")
             return False
 
-        elif "localhost:6520" in result.stdout and "device" in result.stdout:
-            self.logger.log("Connected to emulator at localhost:6520")
+        elif state == "device":
+            self.logger.log(f"Connected to emulator at {self.adb_serial}")
             return True
 
         if DEBUG:
@@ -294,8 +332,57 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         raise FileNotFoundError(f"adb.exe not found at expected location: {adb_path}")
 
     def adb(self, command, binary_output=False):
+        """
+        Runs an adb command, preferring the persistent adb server transport.
+
+        shell, exec-out and devices commands are multiplexed over self.transport.
+        Anything else, or any command the transport cannot service (e.g. the adb
+        server is not running yet), goes through adb.exe. A shell command that
+        already reached the device is never run again through adb.exe, so a tap
+        or swipe cannot happen twice; its AdbTransportError is raised instead.
+        """
+        transport = getattr(self, "transport", None)
+        health = getattr(self, "health", None)
+        if transport is not None:
+            try:
+                result = None
+                if command.startswith("shell ") and not binary_output:
+                    result = transport.shell(command[len("shell ") :])
+                elif command.startswith("exec-out "):
+                    result = transport.exec_out(command[len("exec-out ") :], binary_output=binary_output)
+                elif command == "devices":
+                    result = transport.host_service("host:devices")
+                if result is not None:
+                    if health is not None and command != "devices":
+                        health.record_success()
+                    return result
+            except AdbTransportError as error:
+                if error.delivered:
+                    if health is not None:
+                        health.record_failure()
+                    raise
+                if DEBUG:
+                    print(f"[ADB DEBUG] Transport failed, falling back to adb.exe: {error}")
+
+        result = self._adb_subprocess(command, binary_output)
+        if health is not None and command.startswith(("shell ", "exec-out ")):
+            # adb.exe reports a missing or offline device as "error: ..." on stderr
+            stderr = result.stderr.decode("utf-8", errors="replace") if binary_output else result.stderr
+            if stderr and "error:" in stderr:
+                health.record_failure()
+            elif result.returncode == 0:
+                health.record_success()
+        return result
+
+    def _adb_subprocess(self, command, binary_output=False):
         """Runs an adb command using the located adb.exe path."""
-        full_command = f'"{self.adb_path}" {command}'
+        options = ""
+        if self.adb_server_port != ADB_SERVER_PORT:
+            options += f" -P {self.adb_server_port}"
+        # device commands must name the instance once more than one is connected
+        if not command.startswith(HOST_COMMANDS):
+            options += f" -s {self.adb_serial}"
+        full_command = f'"{self.adb_path}"{options} {command}'
         if DEBUG:
             print(f"[ADB DEBUG] Executing: {full_command}")
             print(f"[ADB DEBUG] ADB path exists: {os.path.exists(self.adb_path)}")
@@ -340,15 +427,20 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         windows = gw.getWindowsWithTitle(title_keyword)
         return windows[0] if windows else None
 
+    def _device_state(self, devices_output: str) -> str | None:
+        """Returns this instance's state ("device", "offline", ...) from ``adb devices`` output"""
+        for line in devices_output.strip().splitlines():
+            if DEBUG:
+                print(line)
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] == self.adb_serial:
+                return fields[1]
+        return None
+
     def _is_connected(self):
         """Returns True if emulator is connected and not offline."""
         result = self.adb("devices")
-        for line in result.stdout.strip().splitlines():
-            if DEBUG:
-                print(line)
-            if "localhost:6520" in line and "device" in line:
-                return True
-        return False
+        return result.stdout is not None and self._device_state(result.stdout) == "device"
 
     def _valid_screen_size(self, expected_dims: tuple):
         # reverse expected_dims just because that's how cv2 works
@@ -366,33 +458,39 @@ class GooglePlayEmulatorController(BaseEmulatorController):
 
     def _set_screen_size(self, width, height):
         self.adb(f"shell wm size {width}x{height}")
+        self.invalidate_frame_cache()
 
     def restart(self):
         restart_start_time = time.time()
 
         self.logger.change_status("Starting Google Play emulator restart process...")
 
-        # close emulator
-        self.logger.change_status("Shutting down Google Play emulator processes...")
-        print("Restarting emulator...")
-        print("Closing emulator...")
-        while self._is_emulator_running():
-            self.stop()
-
-        # boot emulator
-        self.logger.change_status("Starting Google Play emulator...")
-        print("Starting emulator...")
-        while not self._is_emulator_running():
-            self.start()
-            print("Waiting for google play emulator to start...")
-            self.start()
-            time.sleep(0.3)
-
-        # wait for window to appear
-        self.logger.change_status("Waiting for Google Play emulator window...")
-        while self._find_window(self.google_play_emulator_process_name) is None:
-            print("Waiting for emulator window to appear...")
-            time.sleep(0.3)
+        if self.owns_processes:
+            # close emulator
+            self.logger.change_status("Shutting down Google Play emulator processes...")
+            print("Restarting emulator...")
+            print("Closing emulator...")
+            while self._is_emulator_running():
+                self.stop()
+
+            # boot emulator
+            self.logger.change_status("Starting Google Play emulator...")
+            print("Starting emulator...")
+            while not self._is_emulator_running():
+                self.start()
+                print("Waiting for google play emulator to start...")
+                self.start()
+                time.sleep(0.3)
+
+            # wait for window to appear
+            self.logger.change_status("Waiting for Google Play emulator window...")
+            while self._find_window(self.google_play_emulator_process_name) is None:
+                print("Waiting for emulator window to appear...")
+                time.sleep(0.3)
+        else:
+            # the instance is managed elsewhere, only reattach to it
+            self.logger.change_status(f"Reattaching to emulator instance {self.adb_serial}...")
+            self.transport.close()
 
         # reconnect to adb
         self.logger.change_status("Establishing ADB connection to Google Play emulator...")
@@ -435,6 +533,8 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         clash_main_wait_start_time = time.time()
         clash_main_wait_timeout = 240  # s
         time.sleep(12)
+        # pace the checks instead of screenshotting in a tight loop, backing off while the game loads
+        main_menu_backoff = PollBackoff(expected=1.0, min_interval=0.25, max_interval=2.0)
         while 1:
             if time.time() - clash_main_wait_start_time > clash_main_wait_timeout:
                 self.logger.change_status("Timeout waiting for Clash Royale main menu - restarting...")
@@ -449,6 +549,7 @@ class GooglePlayEmulatorController(BaseEmulatorController):
 
             # click deadspace
             self.click(5, 350)
+            time.sleep(main_menu_backoff.next_delay())
 
         restart_duration = str(time.time() - restart_start_time)[:5]
         self.logger.change_status(f"Google Play emulator restart completed successfully in {restart_duration}s")
@@ -466,6 +567,7 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         """
         Closes the Google Play Games Developer Emulator by force-killing related processes.
         Includes: crosvm.exe, Service.exe, client.exe, and others.
+        Controllers that do not own the emulator processes only drop their own adb session.
         """
         process_names = [
             "crosvm.exe",
@@ -476,6 +578,15 @@ class GooglePlayEmulatorController(BaseEmulatorController):
             "adb.exe",
         ]
 
+        # the emulator and adb.exe are about to die, drop the persistent session with them
+        transport = getattr(self, "transport", None)
+        if transport is not None:
+            transport.close()
+
+        # stop() also runs from __del__, before __init__ may have set the flag
+        if not getattr(self, "owns_processes", True):
+            return
+
         for proc in process_names:
             result = subprocess.run(
                 f'taskkill /f /im "{proc}"', shell=True, capture_output=True, text=True, check=False
@@ -492,6 +603,7 @@ class GooglePlayEmulatorController(BaseEmulatorController):
             if clicks == 1:
                 break
             time.sleep(interval)
+        self.invalidate_frame_cache()
 
     def swipe(
         self,
@@ -501,91 +613,13 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         y_coord2: int,
     ):
         self.adb(f"shell input swipe {x_coord1} {y_coord1} {x_coord2} {y_coord2}")
+        self.invalidate_frame_cache()
 
-    def screenshot(self) -> np.ndarray:
-        """
-        Captures a screenshot from the emulator and returns it as a NumPy BGR image (OpenCV format).
-        """
-        if DEBUG:
-            print("[SCREENSHOT DEBUG] Starting screenshot capture...")
-
-        # First test basic connectivity
-        if DEBUG:
-            print("[SCREENSHOT DEBUG] Testing ADB connectivity...")
-        devices_result = self.adb("devices")
-        if DEBUG:
-            print(f"[SCREENSHOT DEBUG] ADB devices output: {devices_result.stdout}")
-
-        if devices_result.returncode != 0:
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] ADB devices failed with return code: {devices_result.returncode}")
-                print(f"[SCREENSHOT DEBUG] ADB devices stderr: {devices_result.stderr}")
-            raise RuntimeError(f"ADB connectivity test failed: {devices_result.stderr}")
-
-        # Now try the screenshot command with binary output
-        if DEBUG:
-            print("[SCREENSHOT DEBUG] Executing screencap command...")
-        result = self.adb("exec-out screencap -p", binary_output=True)
-
-        if DEBUG:
-            print(f"[SCREENSHOT DEBUG] Screenshot command return code: {result.returncode}")
-            print(f"[SCREENSHOT DEBUG] Screenshot stdout type: {type(result.stdout)}")
-            print(f"[SCREENSHOT DEBUG] Screenshot stdout is None: {result.stdout is None}")
-
-        if result.returncode != 0:
-            error_msg = result.stderr if result.stderr else "Unknown error"
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] ADB screenshot failed with error: {error_msg}")
-            raise RuntimeError(f"ADB screenshot failed: {error_msg}")
-
-        if result.stdout is None:
-            if DEBUG:
-                print("[SCREENSHOT DEBUG] Screenshot stdout is None - this indicates ADB command failure")
-            raise RuntimeError("ADB screenshot returned None stdout - command failed silently")
-
-        if len(result.stdout) == 0:
-            if DEBUG:
-                print("[SCREENSHOT DEBUG] Screenshot stdout is empty")
-            raise RuntimeError("ADB screenshot returned empty data")
+    def _exec_out(self, command: str):
+        return self.adb(f"exec-out {command}", binary_output=True)
 
-        if DEBUG:
-            print(f"[SCREENSHOT DEBUG] Screenshot data length: {len(result.stdout)} bytes")
-
-        # Convert bytes to NumPy array
-        try:
-            img_array = np.frombuffer(result.stdout, dtype=np.uint8)
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] NumPy array created, shape: {img_array.shape}")
-        except Exception as e:
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] Failed to create NumPy array: {e}")
-            raise RuntimeError(f"Failed to convert screenshot data to NumPy array: {e}")
-
-        # Decode PNG to image
-        try:
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] Image decoded, shape: {img.shape if img is not None else 'None'}")
-        except Exception as e:
-            if DEBUG:
-                print(f"[SCREENSHOT DEBUG] Failed to decode image: {e}")
-            raise RuntimeError(f"Failed to decode screenshot image: {e}")
-
-        if img is None:
-            if DEBUG:
-                print("[SCREENSHOT DEBUG] cv2.imdecode returned None - invalid image data")
-                # Let's save the raw data to analyze
-                try:
-                    with open("debug_screenshot_data.bin", "wb") as f:
-                        f.write(result.stdout)
-                    print("[SCREENSHOT DEBUG] Raw screenshot data saved to debug_screenshot_data.bin")
-                except Exception as e:
-                    print(f"[SCREENSHOT DEBUG] Failed to save debug data: {e}")
-            raise ValueError("Failed to decode screenshot - image data may be corrupted")
-
-        if DEBUG:
-            print(f"[SCREENSHOT DEBUG] Screenshot successful! Image shape: {img.shape}")
-        return img
+    def _log_screenshot_warning(self, message: str):
+        self.logger.log(message)
 
     def install_apk(self, apk_path: str):
         """
@@ -600,6 +634,7 @@ class GooglePlayEmulatorController(BaseEmulatorController):
             return self._wait_for_clash_installation(package_name)
 
         self.adb(f"shell monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
+        self.invalidate_frame_cache()
 
     def _wait_for_clash_installation(self, package_name: str):
         """Wait for user to install Clash Royale using the logger action system"""
@@ -669,6 +704,7 @@ class GooglePlayEmulatorController(BaseEmulatorController):
         # Test 4: Check if emulator process is running
         print("\n4. Emulator Process Check:")
         print(f"   Is emulator running: {self._is_emulator_running()}")
+        print(f"   Connection health: {self.health.stats()}")
 
         # Test 5: Try to connect
         print("\n5. Connection Attempt:")
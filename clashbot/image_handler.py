@@ -39,6 +39,46 @@ def open_from_buffer(
     return img
 
 
+# android PixelFormat values that screencap can emit without -p
+RAW_FORMAT_RGBA_8888 = 1
+RAW_FORMAT_RGBX_8888 = 2
+RAW_FORMAT_BGRA_8888 = 5
+
+# consecutive captures whose raw framebuffer could not be read before a controller switches to PNG screencap
+RAW_FAILURES_BEFORE_PNG = 3
+
+
+def open_from_raw_framebuffer(
+    image_data: bytes | bytearray | memoryview,
+) -> np.ndarray[np.uint8]:
+    """A method to read the raw output of ``screencap`` (no ``-p``)
+    The payload is mapped without copying and only swizzled to BGR,
+    no PNG codec is involved in either direction.
+    :param image_data: header (width, height, format[, colorspace]) followed by pixels
+    :return: the image as a BGR numpy array
+    :raises InvalidImageError: if the header or payload is not a supported framebuffer
+    """
+    if len(image_data) < 12:
+        raise InvalidImageError("image_data is too short for a framebuffer header")
+    width, height, pixel_format = np.frombuffer(image_data, dtype="<u4", count=3)
+    payload_size = int(width) * int(height) * 4
+
+    # android P and later append a 4 byte colorspace field to the header
+    header_size = len(image_data) - payload_size
+    if width == 0 or height == 0 or header_size not in (12, 16):
+        raise InvalidImageError(
+            f"image_data is not a {width}x{height} framebuffer ({len(image_data)} bytes)",
+        )
+
+    pixels = np.frombuffer(image_data, dtype=np.uint8, count=payload_size, offset=header_size)
+    pixels = pixels.reshape(int(height), int(width), 4)
+    if pixel_format in (RAW_FORMAT_RGBA_8888, RAW_FORMAT_RGBX_8888):
+        return cv2.cvtColor(pixels, cv2.COLOR_RGBA2BGR)  # pylint: disable=no-member
+    if pixel_format == RAW_FORMAT_BGRA_8888:
+        return cv2.cvtColor(pixels, cv2.COLOR_BGRA2BGR)  # pylint: disable=no-member
+    raise InvalidImageError(f"Unsupported framebuffer pixel format {pixel_format}")
+
+
 def open_from_path(path: str) -> np.ndarray[np.uint8]:
     """A method to validate and open an image file
     :param path: the path to the image file
@@ -59,3 +99,15 @@ def open_from_path(path: str) -> np.ndarray[np.uint8]:
                 f"File {path} is not a valid image. {error.message}",
                 path=path,
             ) from error
+
+
+def build_pyramid(image: np.ndarray, levels: int) -> list[np.ndarray]:
+    """A method to build a Gaussian image pyramid
+    :param image: the full resolution image
+    :param levels: the number of times to halve the resolution
+    :return: the images from full resolution (index 0) down to the coarsest level
+    """
+    pyramid = [image]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))  # pylint: disable=no-member
+    return pyramid
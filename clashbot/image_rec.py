@@ -1,11 +1,104 @@
 import os
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from os.path import abspath, dirname, join
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 
 import cv2
 import numpy as np
 
 from image_handler import *
+from template_library import TemplateSet, template_library
+
+# =============================================================================
+# MATCHING THREAD POOL
+# =============================================================================
+
+# minimum number of result rows per tile when a template is split across workers
+MIN_TILE_ROWS = 64
+
+# pyramid mode: smallest template edge allowed at the coarsest level,
+# number of coarse peaks refined at full resolution and refine margin in pixels
+PYRAMID_MIN_TEMPLATE = 8
+PYRAMID_CANDIDATES = 3
+PYRAMID_TOLERANCE = 2
+# further coarse peaks scoring within this of the threshold are refined too, up to the maximum
+PYRAMID_COARSE_SLACK = 0.2
+PYRAMID_MAX_CANDIDATES = 16
+
+# pixels added around a template's learned search region (regions.json)
+REGION_MARGIN = 8
+
+_matching_workers = min(8, os.cpu_count() or 1)
+_matching_executor: ThreadPoolExecutor | None = None
+_matching_executor_lock = threading.Lock()
+# callers currently submitting to each shared pool, a replaced pool is shut down after its last one
+_matching_executor_users: dict[ThreadPoolExecutor, int] = {}
+
+
+def _get_matching_executor_locked() -> ThreadPoolExecutor:
+    global _matching_executor
+    if _matching_executor is None:
+        _matching_executor = ThreadPoolExecutor(
+            max_workers=_matching_workers,
+            thread_name_prefix="ImageRecognition",
+        )
+    return _matching_executor
+
+
+def get_matching_executor() -> ThreadPoolExecutor:
+    """Get the shared, bounded thread pool used for template matching
+
+    Returns:
+        ThreadPoolExecutor: process-wide executor, created on first use
+    """
+    with _matching_executor_lock:
+        return _get_matching_executor_locked()
+
+
+@contextmanager
+def _borrow_matching_executor():
+    """Use the shared pool for a batch of submissions, keeping it alive if it is replaced meanwhile
+
+    Yields:
+        tuple[ThreadPoolExecutor, int]: the shared executor and its number of workers
+    """
+    with _matching_executor_lock:
+        executor = _get_matching_executor_locked()
+        _matching_executor_users[executor] = _matching_executor_users.get(executor, 0) + 1
+        workers = _matching_workers
+    try:
+        yield executor, workers
+    finally:
+        with _matching_executor_lock:
+            _matching_executor_users[executor] -= 1
+            idle = _matching_executor_users[executor] == 0
+            if idle:
+                del _matching_executor_users[executor]
+            retired = idle and executor is not _matching_executor
+        if retired:
+            executor.shutdown(wait=False)
+
+
+def set_matching_workers(max_workers: int):
+    """Resize the shared template matching thread pool
+
+    Callers already matching on the old pool finish on it, and it is shut
+    down once the last of them is done.
+
+    Args:
+        max_workers: number of matching threads shared by every caller in the process
+    """
+    global _matching_executor, _matching_workers
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    with _matching_executor_lock:
+        _matching_workers = max_workers
+        retired, _matching_executor = _matching_executor, None
+        in_use = retired is not None and _matching_executor_users.get(retired, 0) > 0
+    if retired is not None and not in_use:
+        retired.shutdown(wait=False)
 
 # =============================================================================
 # IMAGE RECOGNITION FUNCTIONS
@@ -18,6 +111,8 @@ def find_image(
     tolerance: float = 0.88,
     subcrop: tuple[int, int, int, int] | None = None,
     show_image: bool = False,
+    executor: Executor | None = None,
+    pyramid_levels: int = 0,
 ) -> tuple[int, int] | None:
     """Find the first matching reference image in a screenshot
 
@@ -26,6 +121,8 @@ def find_image(
         folder: folder containing reference images (within reference_images directory)
         tolerance: matching tolerance (0.0 to 1.0)
         subcrop: optional subcrop region as (x1, y1, x2, y2) to search within
+        executor: optional executor to run matching on, defaults to the shared pool
+        pyramid_levels: match coarse-to-fine over this many halvings (0 = full resolution only)
 
     Returns:
         tuple[int, int] | None: (x, y) coordinates of found image relative to full image, or None if not found
@@ -43,16 +140,20 @@ def find_image(
     #     plt.title(f"Searching for {folder} in image")
     #     plt.show()
 
-    locations, filenames = find_references(search_image, folder, tolerance)
-    coord = get_first_location(locations)
-    if coord is not None:
-        # Find which file matched
-        for i, location in enumerate(locations):
-            if location is not None:
-                print(f"Match found in file: {filenames[i]}")
-                break
+    matches = match_templates(
+        search_image,
+        folder,
+        tolerance,
+        first_only=True,
+        executor=executor,
+        pyramid_levels=pyramid_levels,
+        origin=(offset_x, offset_y),
+    )
+    match = next((match for match in matches if match.location is not None), None)
+    if match is not None:
+        print(f"Match found in file: {match.name}")
         # Convert from [y, x] to (x, y) and add offset to get coordinates relative to full image
-        return (coord[1] + offset_x, coord[0] + offset_y)
+        return (match.location[1] + offset_x, match.location[0] + offset_y)
     return None
 
 
@@ -60,6 +161,8 @@ def find_references(
     image: np.ndarray,
     folder: str,
     tolerance=0.88,
+    executor: Executor | None = None,
+    pyramid_levels: int = 0,
 ) -> tuple[list[list[int] | None], list[str]]:
     """Find all reference images in a screenshot
 
@@ -68,58 +171,324 @@ def find_references(
         image (numpy.ndarray): image to find references in
         folder (str): folder to find references (from within reference_images)
         tolerance (float, optional): tolerance. Defaults to 0.88.
+        executor (Executor, optional): executor to run matching on. Defaults to the shared pool.
+        pyramid_levels (int, optional): coarse-to-fine levels. Defaults to 0 (full resolution only).
 
     Returns:
     -------
-        tuple[list[list[int] | None], list[str]]: coordinate locations and corresponding filenames
+        tuple[list[list[int] | None], list[str]]: coordinate locations and corresponding filenames, index-aligned
 
     """
-    top_level = dirname(__file__)
-    reference_folder = abspath(join(top_level, "reference_images", folder))
-
-    filenames = [name for name in os.listdir(reference_folder) if name.endswith(".png") or name.endswith(".jpg")]
-
-    reference_images = [open_from_path(join(reference_folder, name)) for name in filenames]
-
-    with ThreadPoolExecutor(
-        max_workers=len(reference_images),
-        thread_name_prefix="ImageRecognition",
-    ) as executor:
-        futures: list[Future[list[int] | None]] = [
-            executor.submit(
-                compare_images,
-                image,
-                template,
-                tolerance,
+    matches = match_templates(image, folder, tolerance, executor=executor, pyramid_levels=pyramid_levels)
+    return [match.location for match in matches], [match.name for match in matches]
+
+
+@dataclass(frozen=True)
+class TemplateMatch:
+    """Result of matching one reference image against a screenshot"""
+
+    name: str
+    score: float  # best TM_CCOEFF_NORMED score anywhere in the search area
+    location: list[int] | None  # [y, x] if exactly one location passed the threshold
+    elapsed: float  # seconds spent matching this template
+
+
+def match_templates(
+    image: np.ndarray,
+    folder: str,
+    tolerance: float = 0.88,
+    first_only: bool = False,
+    executor: Executor | None = None,
+    pyramid_levels: int = 0,
+    origin: tuple[int, int] = (0, 0),
+    use_regions: bool = True,
+) -> list[TemplateMatch]:
+    """Match every reference image of a folder against a screenshot
+
+    Work is split into (template, image tile) jobs on a bounded executor,
+    so large folders and large screenshots scale across cores without
+    creating threads per call. Results are always in template name order.
+
+    Args:
+        image: image to find references in
+        folder: folder to find references (from within reference_images)
+        tolerance: matching threshold (0.0 to 1.0)
+        first_only: stop at the first template that matches and cancel the remaining work
+        executor: executor to run matching on, defaults to the shared pool
+        pyramid_levels: match on images downscaled this many times first, then refine
+            the best coarse candidates at full resolution (0 = full resolution only)
+        origin: (x, y) of the image's top left corner in the full screenshot, for subcrops
+        use_regions: search only each template's regions.json area plus REGION_MARGIN
+
+    Returns:
+        list[TemplateMatch]: one result per template in name order. With first_only the
+        list ends at the first match, templates after it are not evaluated.
+    """
+    template_set = template_library.get(folder)
+
+    # convert the screenshot once, templates are stored pre-grayscaled
+    image = np.ascontiguousarray(cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)) if image.ndim == 3 else image
+
+    if executor is not None:
+        return _match_template_set(
+            image, template_set, tolerance, first_only, executor, _matching_workers, pyramid_levels, origin, use_regions
+        )
+    with _borrow_matching_executor() as (shared_executor, workers):
+        return _match_template_set(
+            image, template_set, tolerance, first_only, shared_executor, workers, pyramid_levels, origin, use_regions
+        )
+
+
+def _match_template_set(
+    image: np.ndarray,
+    template_set: TemplateSet,
+    tolerance: float,
+    first_only: bool,
+    executor: Executor,
+    workers: int,
+    pyramid_levels: int,
+    origin: tuple[int, int],
+    use_regions: bool,
+) -> list[TemplateMatch]:
+    """Body of match_templates once the screenshot is grayscale and the executor is chosen"""
+    # only tile when there are fewer templates than workers to keep busy
+    tiles_per_template = max(1, -(-workers // max(1, len(template_set.templates))))
+
+    image_pyramid = build_pyramid(image, pyramid_levels) if pyramid_levels > 0 else None
+    futures: list[list[Future[tuple[np.ndarray, np.ndarray, float, float]]]] = []
+    for index, template in enumerate(template_set.templates):
+        region = template_set.regions[index] if use_regions else None
+        if region is not None:
+            # a learned region is already a small window, match it in one job at full resolution
+            futures.append(
+                [executor.submit(_match_region, image, template, tolerance, _search_window(image, region, origin))]
+            )
+        elif image_pyramid is not None:
+            # coarse matching is cheap, so each template is a single job on a shared image pyramid
+            futures.append(
+                [executor.submit(_match_pyramid, image_pyramid, template_set.pyramid(index, pyramid_levels), tolerance)]
+            )
+        else:
+            futures.append(
+                [
+                    executor.submit(_match_rows, image, template, tolerance, row_start, row_stop)
+                    for row_start, row_stop in _split_rows(image, template, tiles_per_template)
+                ]
+            )
+
+    # the pool runs jobs first in, first out, so waiting in name order costs nothing
+    results = []
+    for index, (name, template_futures) in enumerate(zip(template_set.names, futures)):
+        bands = [future.result() for future in template_futures]
+        hit_count = sum(len(ys) for ys, _, _, _ in bands)
+        location = None
+        if hit_count == 1:
+            ys, xs, _, _ = next(band for band in bands if len(band[0]))
+            location = [int(ys[0]), int(xs[0])]
+        results.append(
+            TemplateMatch(
+                name=name,
+                score=max((score for _, _, score, _ in bands), default=float("-inf")),
+                location=location,
+                elapsed=sum(elapsed for _, _, _, elapsed in bands),
             )
-            for template in reference_images
-        ]
-        results = [future.result() for future in as_completed(futures)]
-        return results, filenames
+        )
+
+        if first_only and location is not None:
+            for pending in futures[index + 1 :]:
+                for future in pending:
+                    future.cancel()
+            break
+    return results
+
+
+def _search_window(
+    image: np.ndarray,
+    region: tuple[int, int, int, int],
+    origin: tuple[int, int],
+) -> tuple[int, int, int, int]:
+    """Convert a full-screenshot region to a clipped (x1, y1, x2, y2) window of `image`, plus REGION_MARGIN
+
+    Every bound is clipped to the image, so a region outside a subcrop gives
+    an empty window (x2 <= x1 or y2 <= y1) instead of wrapping around.
+    """
+    x1, y1, x2, y2 = region
+    origin_x, origin_y = origin
+    height, width = image.shape[:2]
+    return (
+        min(max(0, x1 - REGION_MARGIN - origin_x), width),
+        min(max(0, y1 - REGION_MARGIN - origin_y), height),
+        min(max(0, x2 + REGION_MARGIN - origin_x), width),
+        min(max(0, y2 + REGION_MARGIN - origin_y), height),
+    )
+
+
+def _match_region(
+    image_gray: np.ndarray,
+    template_gray: np.ndarray,
+    threshold: float,
+    window: tuple[int, int, int, int],
+) -> tuple[np.ndarray, np.ndarray, float, float]:
+    """Match a template inside one (x1, y1, x2, y2) window, returning image coordinates"""
+    x1, y1, x2, y2 = window
+    if x2 <= x1 or y2 <= y1:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), float("-inf"), 0.0
+    crop = image_gray[y1:y2, x1:x2]
+    result_rows = crop.shape[0] - template_gray.shape[0] + 1
+    if result_rows <= 0 or crop.shape[1] < template_gray.shape[1]:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), float("-inf"), 0.0
+    ys, xs, score, elapsed = _match_rows(crop, template_gray, threshold, 0, result_rows)
+    return ys + y1, xs + x1, score, elapsed
+
+
+def _split_rows(image: np.ndarray, template: np.ndarray, tiles: int) -> list[tuple[int, int]]:
+    """Split the rows of the match result map into at most `tiles` disjoint bands"""
+    result_rows = image.shape[0] - template.shape[0] + 1
+    if result_rows <= 0 or template.shape[1] > image.shape[1]:
+        return []
+    tiles = max(1, min(tiles, result_rows // MIN_TILE_ROWS))
+    bounds = np.linspace(0, result_rows, tiles + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _match_rows(
+    image_gray: np.ndarray,
+    template_gray: np.ndarray,
+    threshold: float,
+    row_start: int,
+    row_stop: int,
+) -> tuple[np.ndarray, np.ndarray, float, float]:
+    """Match a template over one band of result rows
+
+    The image slice overlaps the next band by the template height, so bands
+    cover the result map exactly once and hits never need de-duplicating.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, float, float]: (ys, xs) of every location at or
+        above threshold, the best score in the band and the seconds spent matching
+    """
+    start_time = time.perf_counter()
+    band = image_gray[row_start : row_stop + template_gray.shape[0] - 1]
+    res = cv2.matchTemplate(band, template_gray, cv2.TM_CCOEFF_NORMED)
+    ys, xs = np.nonzero(res >= threshold)
+    return ys + row_start, xs, float(res.max()), time.perf_counter() - start_time
+
+
+def _match_pyramid(
+    image_pyramid: list[np.ndarray],
+    template_pyramid: list[np.ndarray],
+    threshold: float,
+    candidates: int = PYRAMID_CANDIDATES,
+    tolerance: int = PYRAMID_TOLERANCE,
+) -> tuple[np.ndarray, np.ndarray, float, float]:
+    """Match a template coarse-to-fine
+
+    The template is matched over the whole image at the coarsest usable level,
+    then the best `candidates` coarse peaks, and any further ones scoring within
+    PYRAMID_COARSE_SLACK of the threshold (up to PYRAMID_MAX_CANDIDATES), are
+    re-matched at full resolution in windows of one coarse pixel plus
+    `tolerance` pixels around them. Hits and
+    scores are full resolution values, so a match found this way is at exactly
+    the location full-frame matching reports, and any peak within `tolerance`
+    pixels of a coarse candidate is found. If no refined candidate reaches the
+    threshold although some coarse peak scored within PYRAMID_COARSE_SLACK of
+    it (the true peak can be blurred at the coarse level, e.g. on flat UI with
+    thin text), the template is matched at full resolution. A template whose
+    coarse scores all stay below that is reported missing straight away, which
+    keeps the common "is this icon on screen?" miss cheap.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, float, float]: (ys, xs) of every refined location
+        at or above threshold, the best refined score and the seconds spent matching
+    """
+    start_time = time.perf_counter()
+    image, template = image_pyramid[0], template_pyramid[0]
+    result_h = image.shape[0] - template.shape[0] + 1
+    result_w = image.shape[1] - template.shape[1] + 1
+    if result_h <= 0 or result_w <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), float("-inf"), 0.0
+
+    # small icons cannot be halved as often as large ones
+    level = min(len(image_pyramid), len(template_pyramid)) - 1
+    while level > 0 and min(template_pyramid[level].shape[:2]) < PYRAMID_MIN_TEMPLATE:
+        level -= 1
+    if level == 0:
+        ys, xs, score, _ = _match_rows(image, template, threshold, 0, result_h)
+        return ys, xs, score, time.perf_counter() - start_time
+
+    coarse = cv2.matchTemplate(image_pyramid[level], template_pyramid[level], cv2.TM_CCOEFF_NORMED)
+    scale = 2**level
+    margin = scale + tolerance
+    suppress_y = max(1, template_pyramid[level].shape[0] // 2)
+    suppress_x = max(1, template_pyramid[level].shape[1] // 2)
+
+    coarse_best = float(coarse.max())
+    hits: set[tuple[int, int]] = set()
+    best_score = float("-inf")
+    for index in range(PYRAMID_MAX_CANDIDATES):
+        coarse_y, coarse_x = np.unravel_index(int(np.argmax(coarse)), coarse.shape)
+        coarse_score = coarse[coarse_y, coarse_x]
+        if not np.isfinite(coarse_score):
+            break
+        # past the top candidates, keep refining peaks that could still reach the threshold
+        if index >= candidates and coarse_score < threshold - PYRAMID_COARSE_SLACK:
+            break
+        # non-maximum suppression so the next candidate is a different peak
+        coarse[
+            max(0, coarse_y - suppress_y) : coarse_y + suppress_y + 1,
+            max(0, coarse_x - suppress_x) : coarse_x + suppress_x + 1,
+        ] = -np.inf
+
+        y0, x0 = max(0, coarse_y * scale - margin), max(0, coarse_x * scale - margin)
+        y1, x1 = min(result_h, coarse_y * scale + margin + 1), min(result_w, coarse_x * scale + margin + 1)
+        window = image[y0 : y1 + template.shape[0] - 1, x0 : x1 + template.shape[1] - 1]
+        res = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        best_score = max(best_score, float(res.max()))
+        for y, x in zip(*np.nonzero(res >= threshold)):
+            hits.add((int(y) + y0, int(x) + x0))
+
+    if not hits and coarse_best >= threshold - PYRAMID_COARSE_SLACK:
+        ys, xs, score, _ = _match_rows(image, template, threshold, 0, result_h)
+        return ys, xs, score, time.perf_counter() - start_time
+
+    ordered = sorted(hits)
+    ys = np.array([y for y, _ in ordered], dtype=np.intp)
+    xs = np.array([x for _, x in ordered], dtype=np.intp)
+    return ys, xs, best_score, time.perf_counter() - start_time
 
 
 def compare_images(
     image: np.ndarray,
     template: np.ndarray,
     threshold=0.8,
+    pyramid_levels: int = 0,
 ):
     """Detects pixel location of a template in an image using template matching
 
     Args:
-        image (numpy.ndarray): image to find template within
-        template (numpy.ndarray): template image to match to
+        image (numpy.ndarray): image to find template within, color or already grayscale
+        template (numpy.ndarray): template image to match to, color or already grayscale
         threshold (float, optional): matching threshold. Defaults to 0.8
+        pyramid_levels (int, optional): coarse-to-fine levels. Defaults to 0 (full resolution only)
 
     Returns:
         list[int] | None: pixel location [y, x] or None if not found
     """
-    img_gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-    template_gray = cv2.cvtColor(template, cv2.COLOR_RGB2GRAY)
+    img_gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    template_gray = cv2.cvtColor(template, cv2.COLOR_RGB2GRAY) if template.ndim == 3 else template
 
     # Check if template is larger than image
     if template_gray.shape[0] > img_gray.shape[0] or template_gray.shape[1] > img_gray.shape[1]:
         return None
 
+    if pyramid_levels > 0:
+        ys, xs, _, _ = _match_pyramid(
+            build_pyramid(img_gray, pyramid_levels),
+            build_pyramid(template_gray, pyramid_levels),
+            threshold,
+        )
+        return None if len(ys) != 1 else [int(ys[0]), int(xs[0])]
+
     res = cv2.matchTemplate(img_gray, template_gray, cv2.TM_CCOEFF_NORMED)
     loc = np.where(res >= threshold)
 
@@ -155,6 +524,100 @@ def pixel_is_equal(
     return (diff_r < tol) and (diff_g < tol) and (diff_b < tol)
 
 
+def pixels_match(
+    pixels_1: np.ndarray | list,
+    pixels_2: np.ndarray | list,
+    tol: float,
+) -> np.ndarray:
+    """Compare pixels channel-wise in one broadcast operation
+
+    Args:
+        pixels_1: (..., 3) array of pixels
+        pixels_2: (..., 3) array of pixels, or a single (3,) color broadcast against pixels_1
+        tol: color tolerance, every channel must differ by less than this
+
+    Returns:
+        np.ndarray: boolean array with one entry per pixel
+    """
+    diff = np.abs(np.asarray(pixels_1, dtype=np.int16) - np.asarray(pixels_2, dtype=np.int16))
+    return np.all(diff < tol, axis=-1)
+
+
+def sample_pixels(
+    image: np.ndarray,
+    xs: np.ndarray | list[int],
+    ys: np.ndarray | list[int],
+    rgb: bool = True,
+) -> np.ndarray:
+    """Gather pixels at many coordinates with a single fancy index
+
+    Args:
+        image: BGR image
+        xs: x coordinates
+        ys: y coordinates
+        rgb: return pixels in RGB order instead of the image's BGR order
+
+    Returns:
+        np.ndarray: (N, 3) array of pixels
+    """
+    pixels = image[np.asarray(ys), np.asarray(xs)]
+    return pixels[..., ::-1] if rgb else pixels
+
+
+def line_has_color(
+    image: np.ndarray,
+    x_1: int,
+    y_1: int,
+    x_2: int,
+    y_2: int,
+    color: tuple[int, int, int],
+    tol: float = 35,
+) -> bool:
+    """Check if any pixel along a line of an image matches a specific color
+
+    Args:
+        image: BGR image
+        x_1, y_1, x_2, y_2: line coordinates
+        color: RGB color to check for
+        tol: color tolerance
+
+    Returns:
+        bool: True if any pixel on line matches color
+    """
+    xs, ys = np.asarray(get_line_coordinates(x_1, y_1, x_2, y_2)).T
+    return bool(np.any(pixels_match(sample_pixels(image, xs, ys), color, tol)))
+
+
+def region_matches_color(
+    image: np.ndarray,
+    region: list,
+    color: tuple[int, int, int],
+    tol: float = 35,
+    step: int = 2,
+) -> bool:
+    """Check if an entire region of an image matches a specific color
+
+    Args:
+        image: BGR image
+        region: [left, top, width, height] region to check
+        color: RGB color to check for
+        tol: color tolerance
+        step: sample every `step` pixels in both directions
+
+    Returns:
+        bool: True if every sampled pixel matches color
+
+    Raises:
+        IndexError: if the region is not entirely inside the image
+    """
+    left, top, width, height = region
+    # numpy would silently clip the slice, and an empty slice "matches" any color
+    if left < 0 or top < 0 or left + width > image.shape[1] or top + height > image.shape[0]:
+        raise IndexError(f"Region {region} is outside the {image.shape[1]}x{image.shape[0]} image")
+    pixels = image[top : top + height : step, left : left + width : step, ::-1]
+    return bool(np.all(pixels_match(pixels, color, tol)))
+
+
 def check_line_for_color(
     emulator,
     x_1: int,
@@ -173,16 +636,7 @@ def check_line_for_color(
     Returns:
         bool: True if any pixel on line matches color
     """
-    coordinates = get_line_coordinates(x_1, y_1, x_2, y_2)
-    iar = np.asarray(emulator.screenshot())
-
-    for coordinate in coordinates:
-        pixel = iar[coordinate[1]][coordinate[0]]
-        pixel = convert_pixel(pixel)
-
-        if pixel_is_equal(color, pixel, tol=35):
-            return True
-    return False
+    return line_has_color(np.asarray(emulator.screenshot()), x_1, y_1, x_2, y_2, color, tol=35)
 
 
 def region_is_color(emulator, region: list, color: tuple[int, int, int]) -> bool:
@@ -196,17 +650,7 @@ def region_is_color(emulator, region: list, color: tuple[int, int, int]) -> bool
     Returns:
         bool: True if entire region matches color
     """
-    left, top, width, height = region
-    iar = np.asarray(emulator.screenshot())
-
-    for x_index in range(left, left + width, 2):
-        for y_index in range(top, top + height, 2):
-            pixel = iar[y_index][x_index]
-            pixel = convert_pixel(pixel)
-            if not pixel_is_equal(color, pixel, tol=35):
-                return False
-
-    return True
+    return region_matches_color(np.asarray(emulator.screenshot()), region, color, tol=35, step=2)
 
 
 def all_pixels_are_equal(
@@ -224,10 +668,9 @@ def all_pixels_are_equal(
     Returns:
         bool: True if all pixels match within tolerance
     """
-    for pixel1, pixel2 in zip(pixels_1, pixels_2):
-        if not pixel_is_equal(pixel1, pixel2, tol):
-            return False
-    return True
+    # like zip(), compare only as many pixels as the shorter list holds
+    count = min(len(pixels_1), len(pixels_2))
+    return bool(np.all(pixels_match(np.asarray(pixels_1)[:count], np.asarray(pixels_2)[:count], tol)))
 
 
 # =============================================================================
@@ -0,0 +1,190 @@
+import time
+
+from navigator import NavigationEdge, Navigator
+from page_classifier import PageClassifier
+from poll_backoff import PollBackoff
+from template_library import template_library
+
+
+class NavigationExecutor:
+    """
+    Drives the emulator along Navigator routes, checking every step with the page classifier.
+
+    Each click is followed by polling for its destination page on a
+    PollBackoff tuned to the edge's expected latency. Reaching the
+    destination records the observed latency for route planning; landing on
+    any other recognized page (a popup, a wrong click) stops the wait early
+    and the route is re-planned from there.
+
+    While waiting, each poll first checks only the expected destination, the
+    page the click was made on and the known ``popups`` (see
+    PageClassifier.expectation), and only falls back to a full
+    classification when none or several of them match (a popup over the
+    destination can leave the destination's fingerprint visible). The
+    reference image folders listed for the destination in ``page_templates``
+    are loaded into the template library right after the click, before the
+    page appears.
+    """
+
+    def __init__(
+        self,
+        controller,
+        navigator: Navigator,
+        classifier: PageClassifier | None = None,
+        timeout: float = 30.0,
+        min_interval: float = 0.05,
+        max_interval: float = 1.0,
+        unexpected_confirmations: int = 2,
+        step_timeout_factor: float = 4.0,
+        popups: list[str] | None = None,
+        page_templates: dict[str, list[str]] | None = None,
+        logger=None,
+    ):
+        self.controller = controller
+        self.navigator = navigator
+        self.classifier = classifier if classifier is not None else PageClassifier.from_csv()
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.unexpected_confirmations = unexpected_confirmations
+        self.step_timeout_factor = step_timeout_factor
+        self.popups = list(popups or [])
+        self.page_templates = page_templates or {}
+        self.logger = logger
+
+        self.polls = 0
+
+    def _log(self, message: str):
+        if self.logger is not None:
+            self.logger.log(message)
+        else:
+            print(message)
+
+    def current_page(self, likely: list[str] | None = None) -> str | None:
+        """Classify a fresh screenshot
+
+        Args:
+            likely: pages to check before a full classification, most likely first
+
+        Returns:
+            str | None: recognized page, or None if no fingerprint matches (e.g. mid-animation)
+        """
+        self.controller.invalidate_frame_cache()
+        self.polls += 1
+        return self.classifier.classify_one(self.controller.screenshot(), likely=likely)
+
+    def prefetch(self, label: str):
+        """Load the reference images used on a page before it appears"""
+        for folder in self.page_templates.get(label, []):
+            try:
+                template_library.get(folder)
+            except OSError as e:
+                self._log(f"[!] Could not prefetch templates {folder}: {e}")
+
+    def wait_for_page(
+        self,
+        label: str,
+        timeout: float | None = None,
+        expected: float | None = None,
+        source: str | None = None,
+    ) -> str | None:
+        """Poll until a page is recognized
+
+        Args:
+            label: page to wait for
+            timeout: seconds before giving up, defaults to the executor timeout
+            expected: expected seconds until the page appears, tunes the polling schedule
+            source: page the transition started from; still seeing it is not unexpected
+
+        Returns:
+            str | None: label if it appeared, another page if that was recognized instead
+            (seen on ``unexpected_confirmations`` consecutive polls), or None on timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        expected = self.navigator.default_latency if expected is None else expected
+        backoff = PollBackoff(expected, self.min_interval, self.max_interval)
+        deadline = time.monotonic() + timeout
+        likely = [label] + ([source] if source is not None else []) + self.popups
+
+        unexpected, unexpected_count = None, 0
+        while True:
+            delay = backoff.next_delay()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+
+            page = self.current_page(likely)
+            if page == label:
+                return page
+            if page is None or page == source:
+                unexpected, unexpected_count = None, 0
+                continue
+
+            # a single frame may be caught mid-transition, so wait for the page to settle
+            unexpected_count = unexpected_count + 1 if page == unexpected else 1
+            unexpected = page
+            if unexpected_count >= self.unexpected_confirmations:
+                return page
+
+    def perform(self, edge: NavigationEdge):
+        """Perform the action of one navigation edge"""
+        if edge.action != "click":
+            raise ValueError(f"Unsupported navigation action {edge.action!r} on {edge.source} -> {edge.target}")
+        self.controller.click(*edge.coordinates)
+        self.controller.invalidate_frame_cache()
+
+    def goto(self, target: str, timeout: float | None = None, max_replans: int = 5) -> bool:
+        """Navigate to a page, re-planning whenever a step lands somewhere else
+
+        Args:
+            target: page to reach
+            timeout: overall seconds before giving up, defaults to the executor timeout
+            max_replans: detours tolerated before giving up
+
+        Returns:
+            bool: True if the target page was recognized
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        current = self.current_page()
+        replans = 0
+
+        while current != target:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._log(f"[!] Timed out navigating to {target} (last page: {current})")
+                return False
+
+            if current is None:
+                current = self.wait_for_page(target, timeout=remaining)
+                if current is None:
+                    self._log(f"[!] Could not recognize the current page while navigating to {target}")
+                    return False
+                continue
+
+            edge = self.navigator.next_edge(current, target)
+            if edge is None:
+                self._log(f"[!] No route from {current} to {target}")
+                return False
+
+            self.perform(edge)
+            started = time.monotonic()
+            self.prefetch(edge.target)
+            expected = self.navigator.edge_latency(edge)
+            # a step far slower than expected is most likely a missed click, so look again and retry
+            step_timeout = min(remaining, max(expected * self.step_timeout_factor, 2.0))
+            reached = self.wait_for_page(edge.target, timeout=step_timeout, expected=expected, source=edge.source)
+            if reached is None:
+                reached = self.current_page()
+
+            if reached == edge.target:
+                self.navigator.record_transition(edge.source, edge.target, time.monotonic() - started)
+            elif reached != edge.source:
+                replans += 1
+                self._log(f"Expected {edge.target} after {edge.source}, found {reached}; re-planning")
+                if replans > max_replans:
+                    self._log(f"[!] Gave up navigating to {target} after {max_replans} detours")
+                    return False
+            current = reached
+
+        return True
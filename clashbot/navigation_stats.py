@@ -0,0 +1,130 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+NAVIGATION_STATS_FILE = str(Path(__file__).parent.parent / "data" / "navigation_stats.json")
+
+
+class NavigationStats:
+    """
+    Persistent store of observed transition latencies per navigation edge.
+
+    Each edge keeps an exponentially weighted moving average of the time from
+    performing its action to recognizing the destination page, so a one-off
+    slow load does not dominate while lasting changes are picked up after a
+    few transitions. Stats are saved as json next to navigation_graph.json.
+
+    With ``autosave`` observations are written at most once per
+    ``save_interval`` seconds, and whatever is left unsaved is flushed when
+    the process exits.
+    """
+
+    def __init__(
+        self,
+        path: str = NAVIGATION_STATS_FILE,
+        alpha: float = 0.3,
+        autosave: bool = True,
+        save_interval: float = 30.0,
+    ):
+        self.path = path
+        self.alpha = alpha
+        self.autosave = autosave
+        self.save_interval = save_interval
+
+        self.edges: dict[str, dict[str, dict]] = {}
+        # observations not yet written, replayed onto the file's contents by save()
+        self._pending: list[tuple[str, str, float]] = []
+        self._last_save = float("-inf")
+        self._lock = threading.Lock()
+        self.load()
+        if autosave:
+            atexit.register(self._save_quietly)
+
+    def _read(self) -> dict[str, dict[str, dict]] | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as stats_file:
+            return json.load(stats_file).get("edges", {})
+
+    def load(self):
+        """Read the stats file, starting empty if it does not exist"""
+        edges = self._read()
+        if edges is not None:
+            self.edges = edges
+
+    def save(self):
+        """Merge the observations made since the last save into the stats file
+
+        The file is re-read and this process's new observations are folded
+        into it, so observations saved by other processes in the meantime are
+        kept. The write happens under the lock through a uniquely named
+        temporary file and replaces the file atomically; two processes saving
+        at the very same moment can still lose one of their batches.
+        """
+        with self._lock:
+            edges = self._read()
+            if edges is None:
+                edges = self.edges
+            else:
+                for source, target, seconds in self._pending:
+                    self._fold(edges, source, target, seconds)
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, prefix=".navigation_stats-", suffix=".tmp", delete=False
+            ) as stats_file:
+                json.dump({"edges": edges}, stats_file, indent=2, sort_keys=True)
+            try:
+                os.replace(stats_file.name, self.path)
+            except OSError:
+                os.remove(stats_file.name)
+                raise
+
+            self.edges = edges
+            self._pending.clear()
+            self._last_save = time.monotonic()
+
+    def flush(self):
+        """Save now if any observation has not been written yet"""
+        if self._pending:
+            self.save()
+
+    def _save_quietly(self):
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"[!] Warning: could not save navigation stats {self.path}: {e}")
+
+    def _fold(self, edges: dict[str, dict[str, dict]], source: str, target: str, seconds: float):
+        entry = edges.setdefault(source, {}).get(target)
+        if entry is None:
+            entry = {"latency": seconds, "count": 0}
+            edges[source][target] = entry
+        else:
+            entry["latency"] += self.alpha * (seconds - entry["latency"])
+        entry["count"] += 1
+        entry["last"] = seconds
+
+    def record(self, source: str, target: str, seconds: float):
+        """Fold one observed transition time into the edge's average
+
+        Args:
+            source: page the action was performed on
+            target: page that was recognized afterwards
+            seconds: time from the action to recognizing target
+        """
+        with self._lock:
+            self._fold(self.edges, source, target, seconds)
+            self._pending.append((source, target, seconds))
+            due = self.autosave and time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self._save_quietly()
+
+    def latency(self, source: str, target: str) -> float | None:
+        """Average observed latency of an edge, or None if it was never observed"""
+        entry = self.edges.get(source, {}).get(target)
+        return entry["latency"] if entry else None
@@ -0,0 +1,202 @@
+import heapq
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from navigation_stats import NavigationStats
+
+NAVIGATION_GRAPH_FILE = str(Path(__file__).parent.parent / "data" / "navigation_graph.json")
+
+
+@dataclass(frozen=True)
+class NavigationEdge:
+    """One recorded transition: perform ``action`` at ``coordinates`` on ``source`` to reach ``target``"""
+
+    source: str
+    target: str
+    action: str
+    coordinates: tuple[int, int]
+    description: str = ""
+
+
+class Navigator:
+    """
+    Route planner over the page graph recorded by tools/navigation_mapper.py.
+
+    The graph is indexed once into integer page ids and an adjacency list,
+    then Dijkstra from every page fills a next-hop table: the first edge to
+    take from page i to reach page j as fast as possible. Edges are weighted
+    by their observed latency from ``stats`` (``default_latency`` until an
+    edge has been observed), so with no stats the fewest clicks win.
+    Looking up a route only follows that table, so re-planning after being
+    thrown off course (e.g. by a popup) costs O(path length). Recording a
+    transition only marks the tables stale, to be rebuilt on the next lookup,
+    once an edge's average has moved more than ``replan_threshold`` (relative)
+    away from the latency it was planned with.
+    """
+
+    def __init__(
+        self,
+        graph: dict[str, list[dict]],
+        stats: NavigationStats | None = None,
+        default_latency: float = 1.0,
+        replan_threshold: float = 0.25,
+    ):
+        self.stats = stats
+        self.default_latency = default_latency
+        self.replan_threshold = replan_threshold
+        self.edges: list[NavigationEdge] = []
+        pages = dict.fromkeys(graph)
+        for source, links in graph.items():
+            for link in links:
+                coordinates = link.get("coordinates") or [0, 0]
+                self.edges.append(
+                    NavigationEdge(
+                        source=source,
+                        target=link["to"],
+                        action=link.get("action", "click"),
+                        coordinates=(int(coordinates[0]), int(coordinates[1])),
+                        description=link.get("description", ""),
+                    )
+                )
+                pages.setdefault(link["to"])
+
+        self.pages = list(pages)
+        self.page_ids = {page: index for index, page in enumerate(self.pages)}
+        self.adjacency: list[list[int]] = [[] for _ in self.pages]
+        self._pair_edges: dict[tuple[str, str], list[int]] = {}
+        for edge_id, edge in enumerate(self.edges):
+            self.adjacency[self.page_ids[edge.source]].append(edge_id)
+            self._pair_edges.setdefault((edge.source, edge.target), []).append(edge_id)
+
+        self._plan()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str = NAVIGATION_GRAPH_FILE,
+        stats: NavigationStats | None = None,
+        default_latency: float = 1.0,
+        replan_threshold: float = 0.25,
+    ) -> "Navigator":
+        """Load the navigation graph json written by tools/navigation_mapper.py"""
+        with open(path, "r") as graph_file:
+            graph = json.load(graph_file).get("navigation_graph", {})
+        return cls(graph, stats=stats, default_latency=default_latency, replan_threshold=replan_threshold)
+
+    def edge_latency(self, edge: NavigationEdge) -> float:
+        """Expected time for one transition: its observed average, or the default if never observed"""
+        latency = self.stats.latency(edge.source, edge.target) if self.stats is not None else None
+        return self.default_latency if latency is None else latency
+
+    def _plan(self):
+        """Fill the all-pairs next-hop, latency and hop-count tables with Dijkstra from every page"""
+        count = len(self.pages)
+        weights = [self.edge_latency(edge) for edge in self.edges]
+        self.planned_weights = weights
+        self.next_hop = np.full((count, count), -1, dtype=np.int32)
+        self.latencies = np.full((count, count), np.inf, dtype=np.float64)
+        self.hops = np.full((count, count), -1, dtype=np.int32)
+
+        for start in range(count):
+            next_hop, latencies, hops = self.next_hop[start], self.latencies[start], self.hops[start]
+            latencies[start], hops[start] = 0.0, 0
+            # ties on latency go to the route with fewer clicks
+            heap = [(0.0, 0, start)]
+            while heap:
+                latency, hop_count, page = heapq.heappop(heap)
+                if (latency, hop_count) > (latencies[page], hops[page]):
+                    continue
+                for edge_id in self.adjacency[page]:
+                    target = self.page_ids[self.edges[edge_id].target]
+                    candidate = (latency + weights[edge_id], hop_count + 1)
+                    if hops[target] >= 0 and candidate >= (latencies[target], hops[target]):
+                        continue
+                    latencies[target], hops[target] = candidate
+                    # the first edge out of start is inherited along the whole branch
+                    next_hop[target] = edge_id if page == start else next_hop[page]
+                    heapq.heappush(heap, (*candidate, target))
+        self._stale = False
+
+    def record_transition(self, source: str, target: str, seconds: float):
+        """Store an observed transition time
+
+        Routes are re-planned on the next lookup only if the edge's average
+        moved past replan_threshold from the latency the routes were planned with.
+
+        Args:
+            source: page the action was performed on
+            target: page that was recognized afterwards
+            seconds: time from the action to recognizing target
+        """
+        if self.stats is None:
+            self.stats = NavigationStats()
+        self.stats.record(source, target, seconds)
+        latency = self.stats.latency(source, target)
+        for edge_id in self._pair_edges.get((source, target), ()):
+            planned = self.planned_weights[edge_id]
+            if abs(latency - planned) > self.replan_threshold * planned:
+                self._stale = True
+
+    def _replan_if_stale(self):
+        if self._stale:
+            self._plan()
+
+    def next_edge(self, current: str, target: str) -> NavigationEdge | None:
+        """Get the first transition to take towards a page
+
+        Args:
+            current: page we are on
+            target: page we want to reach
+
+        Returns:
+            NavigationEdge | None: the edge to take, or None if already there, unknown or unreachable
+        """
+        current_id, target_id = self.page_ids.get(current), self.page_ids.get(target)
+        if current_id is None or target_id is None:
+            return None
+        self._replan_if_stale()
+        edge_id = int(self.next_hop[current_id, target_id])
+        return self.edges[edge_id] if edge_id >= 0 else None
+
+    def route(self, current: str, target: str) -> list[NavigationEdge] | None:
+        """Get the transitions leading from one page to another
+
+        Args:
+            current: page we are on
+            target: page we want to reach
+
+        Returns:
+            list[NavigationEdge] | None: edges in order (empty if already there), or None if unreachable
+        """
+        if current == target:
+            return []
+        if not self.reachable(current, target):
+            return None
+
+        route = []
+        while current != target:
+            edge = self.next_edge(current, target)
+            route.append(edge)
+            current = edge.target
+        return route
+
+    def reachable(self, current: str, target: str) -> bool:
+        """Whether the graph has any route from one page to another"""
+        current_id, target_id = self.page_ids.get(current), self.page_ids.get(target)
+        self._replan_if_stale()
+        return current_id is not None and target_id is not None and self.hops[current_id, target_id] >= 0
+
+    def distance(self, current: str, target: str) -> int | None:
+        """Number of transitions on the planned route, or None if unreachable"""
+        if not self.reachable(current, target):
+            return None
+        return int(self.hops[self.page_ids[current], self.page_ids[target]])
+
+    def expected_latency(self, current: str, target: str) -> float | None:
+        """Expected seconds to reach a page along the planned route, or None if unreachable"""
+        if not self.reachable(current, target):
+            return None
+        return float(self.latencies[self.page_ids[current], self.page_ids[target]])
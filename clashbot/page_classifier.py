@@ -0,0 +1,337 @@
+from pathlib import Path
+
+import numpy as np
+
+from fingerprint_model import FINGERPRINT_CSV, FingerprintModel, load_fingerprints
+
+PIXEL_DATA_FILE = FINGERPRINT_CSV
+PAGE_TREE_FILE = str(Path(__file__).parent.parent / "data" / "models" / "page_tree.npz")
+
+
+class PageClassifier:
+    """
+    Answers "what page am I on?" from the learned pixel fingerprints.
+
+    Every label's fingerprint pixels are packed into flat arrays once, so a
+    frame is checked against all labels with a single gather and one
+    broadcast comparison instead of one check per label.
+
+    Fingerprints are stored as [x, y, b, g, r] rows by tools/pixel_extractor.py.
+    Because recorded screenshots are BGR arrays saved as if they were RGB,
+    the stored b, g, r values are the frame's channels in reverse order.
+    They are flipped once here, so frames from screenshot() and frames read
+    from the training PNGs with PIL compare the same way.
+    """
+
+    def __init__(self, pixel_references: dict[str, list[list[int]]], tolerance: int = 20):
+        self.tolerance = tolerance
+        self.labels = list(pixel_references)
+
+        rows = [pixel for label in self.labels for pixel in pixel_references[label]]
+        packed = np.asarray(rows, dtype=np.int16).reshape(-1, 5)
+        self.xs = packed[:, 0].astype(np.intp)
+        self.ys = packed[:, 1].astype(np.intp)
+        self.colors = np.ascontiguousarray(packed[:, 4:1:-1])  # frame channel order
+
+        counts = [len(pixel_references[label]) for label in self.labels]
+        self.pixel_counts = np.asarray(counts, dtype=np.intp)
+        self.offsets = np.concatenate([[0], np.cumsum(self.pixel_counts)]).astype(np.intp)
+        self.label_ids = np.repeat(np.arange(len(self.labels)), self.pixel_counts)
+
+        self._bounds_shape: tuple[int, int] | None = None
+        self._out_of_bounds = np.zeros(len(self.xs), dtype=bool)
+
+        self._expectations: dict[tuple[str, ...], PageExpectation] = {}
+        self.expectation_hits = 0
+        self.expectation_misses = 0
+
+    @classmethod
+    def from_csv(cls, path: str = PIXEL_DATA_FILE, tolerance: int = 20) -> "PageClassifier":
+        """Load fingerprints from page_rec_pixels.csv, through its binary model when up to date
+
+        Args:
+            path: path to the fingerprint csv
+            tolerance: maximum per-channel difference for a pixel to match
+
+        Returns:
+            PageClassifier: classifier over every label in the file
+        """
+        return cls.from_model(load_fingerprints(path), tolerance=tolerance)
+
+    @classmethod
+    def from_model(cls, model: FingerprintModel, tolerance: int = 20) -> "PageClassifier":
+        """Build a classifier over a loaded FingerprintModel"""
+        return cls(model.as_dict(), tolerance=tolerance)
+
+    def _bounds(self, frame: np.ndarray) -> np.ndarray:
+        """Returns which fingerprint pixels fall outside the frame, cached per frame size"""
+        shape = frame.shape[:2]
+        if shape != self._bounds_shape:
+            self._out_of_bounds = (self.xs >= shape[1]) | (self.ys >= shape[0]) | (self.xs < 0) | (self.ys < 0)
+            self._bounds_shape = shape
+        return self._out_of_bounds
+
+    def pixel_matches(self, frame: np.ndarray) -> np.ndarray:
+        """Check every fingerprint pixel of every label against a frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            np.ndarray: boolean array with one entry per packed fingerprint pixel
+        """
+        out_of_bounds = self._bounds(frame)
+        if out_of_bounds.any():
+            ys = np.where(out_of_bounds, 0, self.ys)
+            xs = np.where(out_of_bounds, 0, self.xs)
+        else:
+            ys, xs = self.ys, self.xs
+        sampled = frame[ys, xs, :3].astype(np.int16)
+        matches = np.all(np.abs(sampled - self.colors) <= self.tolerance, axis=1)
+        return matches & ~out_of_bounds
+
+    def match_mask(self, frame: np.ndarray) -> np.ndarray:
+        """Check a frame against every label
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            np.ndarray: boolean array with one entry per label, True if all its pixels match
+        """
+        failures = np.bincount(self.label_ids[~self.pixel_matches(frame)], minlength=len(self.labels))
+        return failures == 0
+
+    def classify(self, frame: np.ndarray) -> list[str]:
+        """Get every label whose fingerprint matches a frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            list[str]: matching labels in fingerprint file order
+        """
+        return [self.labels[index] for index in np.flatnonzero(self.match_mask(frame))]
+
+    def expectation(self, labels: list[str] | tuple[str, ...]) -> "PageExpectation":
+        """Get the (cached) pre-selected pixel subset for a list of likely labels"""
+        key = tuple(labels)
+        expectation = self._expectations.get(key)
+        if expectation is None:
+            if len(self._expectations) >= 64:
+                self._expectations.clear()
+            expectation = PageExpectation(self, key)
+            self._expectations[key] = expectation
+        return expectation
+
+    def classify_one(self, frame: np.ndarray, likely: list[str] | tuple[str, ...] | None = None) -> str | None:
+        """Get the single best label for a frame
+
+        Args:
+            frame: BGR frame
+            likely: labels likely to be on screen; only their pixels are checked first, and if
+                exactly one of them matches it is returned without a full classification
+
+        Returns:
+            str | None: the matching label with the most fingerprint pixels, or None if nothing matches
+        """
+        if likely:
+            label = self.expectation(likely).check(frame)
+            if label is not None:
+                self.expectation_hits += 1
+                return label
+            self.expectation_misses += 1
+
+        mask = self.match_mask(frame)
+        if not mask.any():
+            return None
+        return self.labels[int(np.argmax(np.where(mask, self.pixel_counts, -1)))]
+
+
+class PageExpectation:
+    """
+    Fingerprint pixels of a few likely labels, gathered out of a PageClassifier once.
+
+    While waiting for a known transition, checking only the destination (and
+    the handful of pages or popups that may show up instead) reads a small
+    fraction of the fingerprint pixels a full classification needs.
+    """
+
+    def __init__(self, classifier: PageClassifier, labels: tuple[str, ...]):
+        label_index = {label: index for index, label in enumerate(classifier.labels)}
+        self.labels = [label for label in dict.fromkeys(labels) if label in label_index]
+        ids = [label_index[label] for label in self.labels]
+
+        indices = np.concatenate(
+            [np.arange(classifier.offsets[i], classifier.offsets[i + 1]) for i in ids] or [np.zeros(0, dtype=np.intp)]
+        ).astype(np.intp)
+        self.xs = classifier.xs[indices]
+        self.ys = classifier.ys[indices]
+        self.colors = classifier.colors[indices]
+        self.tolerance = classifier.tolerance
+        self.label_ids = np.repeat(np.arange(len(ids)), classifier.pixel_counts[ids])
+
+        self._bounds_shape: tuple[int, int] | None = None
+        self._out_of_bounds = np.zeros(len(self.xs), dtype=bool)
+
+    def check(self, frame: np.ndarray) -> str | None:
+        """Get the expected label whose fingerprint matches a frame
+
+        A popup drawn over a page can leave that page's fingerprint pixels
+        visible, so when several expected labels match the answer is left to
+        a full classification instead of guessing from the order.
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            str | None: the only matching label, or None if none or several of them match
+        """
+        matched = self.matching(frame)
+        return matched[0] if len(matched) == 1 else None
+
+    def matching(self, frame: np.ndarray) -> list[str]:
+        """Get every expected label whose fingerprint matches a frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            list[str]: matching labels in the order they were given
+        """
+        if not self.labels:
+            return []
+        shape = frame.shape[:2]
+        if shape != self._bounds_shape:
+            self._out_of_bounds = (self.xs >= shape[1]) | (self.ys >= shape[0]) | (self.xs < 0) | (self.ys < 0)
+            self._bounds_shape = shape
+        out_of_bounds = self._out_of_bounds
+        if out_of_bounds.any():
+            sampled = frame[np.where(out_of_bounds, 0, self.ys), np.where(out_of_bounds, 0, self.xs), :3]
+        else:
+            sampled = frame[self.ys, self.xs, :3]
+
+        matches = np.all(np.abs(sampled.astype(np.int16) - self.colors) <= self.tolerance, axis=1) & ~out_of_bounds
+        failures = np.bincount(self.label_ids[~matches], minlength=len(self.labels))
+        return [self.labels[index] for index in np.flatnonzero(failures == 0)]
+
+
+class PageDecisionTree:
+    """
+    Decision tree over single-channel pixel tests, built by tools/tree_builder.py.
+
+    Each internal node reads one channel of one pixel and compares it against
+    a threshold, so a frame is identified after a handful of reads instead of
+    checking every fingerprint pixel. Leaves hold the set of labels the full
+    fingerprint check reports for the training frames reaching them.
+
+    A frame the tree never saw (a transition, a new popup) can reach a leaf
+    after a few reads without matching that leaf's pages, so when built with
+    a ``classifier`` the leaf's labels are confirmed against their own
+    fingerprint pixels before they are returned.
+    """
+
+    def __init__(
+        self,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        channels: np.ndarray,
+        thresholds: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        leaves: np.ndarray,
+        classes: list[tuple[str, ...]],
+        classifier: PageClassifier | None = None,
+    ):
+        # plain lists are faster than numpy scalars for a node-by-node walk
+        self.xs = [int(value) for value in xs]
+        self.ys = [int(value) for value in ys]
+        self.channels = [int(value) for value in channels]
+        self.thresholds = [int(value) for value in thresholds]
+        self.left = [int(value) for value in left]
+        self.right = [int(value) for value in right]
+        self.leaves = [int(value) for value in leaves]
+        self.classes = classes
+        self.classifier = classifier
+        # fingerprint pixels of each leaf answer, gathered on first use
+        self._verifiers: dict[int, PageExpectation] = {}
+
+    @classmethod
+    def load(cls, path: str = PAGE_TREE_FILE, classifier: PageClassifier | None = None) -> "PageDecisionTree":
+        """Load a tree saved with save()
+
+        Args:
+            path: path to the .npz model
+            classifier: fingerprints to confirm leaf labels with, None trusts the leaves
+
+        Returns:
+            PageDecisionTree: the loaded tree
+        """
+        with np.load(path, allow_pickle=False) as model:
+            classes = [tuple(label for label in key.split("|") if label) for key in model["classes"].tolist()]
+            return cls(
+                model["xs"],
+                model["ys"],
+                model["channels"],
+                model["thresholds"],
+                model["left"],
+                model["right"],
+                model["leaves"],
+                classes,
+                classifier,
+            )
+
+    def save(self, path: str = PAGE_TREE_FILE):
+        """Save the tree as a compressed .npz model
+
+        Args:
+            path: destination path
+        """
+        np.savez_compressed(
+            path,
+            xs=np.asarray(self.xs, dtype=np.int16),
+            ys=np.asarray(self.ys, dtype=np.int16),
+            channels=np.asarray(self.channels, dtype=np.int8),
+            thresholds=np.asarray(self.thresholds, dtype=np.int16),
+            left=np.asarray(self.left, dtype=np.int32),
+            right=np.asarray(self.right, dtype=np.int32),
+            leaves=np.asarray(self.leaves, dtype=np.int32),
+            classes=np.asarray(["|".join(labels) for labels in self.classes]),
+        )
+
+    def classify(self, frame: np.ndarray) -> list[str]:
+        """Get the labels the full fingerprint check would report for a frame
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            list[str]: matching labels, empty if no page matches
+        """
+        height, width = frame.shape[:2]
+        node = 0
+        while self.leaves[node] < 0:
+            x, y = self.xs[node], self.ys[node]
+            # pixels outside the frame can never satisfy "greater than"
+            value = int(frame[y, x, self.channels[node]]) if x < width and y < height else -1
+            node = self.right[node] if value > self.thresholds[node] else self.left[node]
+
+        leaf = self.leaves[node]
+        if self.classifier is None or not self.classes[leaf]:
+            return list(self.classes[leaf])
+        verifier = self._verifiers.get(leaf)
+        if verifier is None:
+            verifier = PageExpectation(self.classifier, self.classes[leaf])
+            self._verifiers[leaf] = verifier
+        return verifier.matching(frame)
+
+    def depth(self, frame: np.ndarray) -> int:
+        """Count the tree tests classify() needs for a frame, before any leaf check"""
+        height, width = frame.shape[:2]
+        node, reads = 0, 0
+        while self.leaves[node] < 0:
+            x, y = self.xs[node], self.ys[node]
+            value = int(frame[y, x, self.channels[node]]) if x < width and y < height else -1
+            node = self.right[node] if value > self.thresholds[node] else self.left[node]
+            reads += 1
+        return reads
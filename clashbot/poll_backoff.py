@@ -0,0 +1,38 @@
+class PollBackoff:
+    """
+    Polling schedule for waiting on a screen change that takes ``expected`` seconds.
+
+    The first check waits for a fraction of the expected latency, since the
+    screen rarely changes sooner. Later checks start at a small interval and
+    grow geometrically up to ``max_interval``, so fast transitions are caught
+    quickly while slow loads do not burn a screenshot every few milliseconds.
+    """
+
+    def __init__(
+        self,
+        expected: float = 1.0,
+        min_interval: float = 0.05,
+        max_interval: float = 1.0,
+        factor: float = 1.5,
+        first_fraction: float = 0.5,
+    ):
+        self.expected = expected
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.first_fraction = first_fraction
+        self.reset()
+
+    def reset(self):
+        """Start the schedule over, e.g. after performing a new action"""
+        self.polls = 0
+        self._interval = min(max(self.expected / 10, self.min_interval), self.max_interval)
+
+    def next_delay(self) -> float:
+        """Seconds to sleep before the next check"""
+        self.polls += 1
+        if self.polls == 1:
+            return min(self.expected * self.first_fraction, self.max_interval)
+        delay = self._interval
+        self._interval = min(self._interval * self.factor, self.max_interval)
+        return delay
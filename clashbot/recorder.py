@@ -1,14 +1,23 @@
+from frame_dedup import DedupIndex
 from google_play import GooglePlayEmulatorController
 import numpy as np
 from PIL import Image
 import os
+import queue
+import threading
 import time
 from pathlib import Path
 
 
 CONFIG = {
     "save_dir": str(Path(__file__).parent.parent / "data" / "training" / "images"),
-    "save_rate": 1,  # in seconds
+    "save_rate": 1,  # in seconds between captures, may be below 1
+    "dedup": True,  # skip frames nearly identical to one already saved this session
+    "dedup_threshold": 4,  # max differing hash bits (of 256) for two frames to count as duplicates
+    "writer_threads": 2,  # threads encoding and writing PNGs off the capture thread
+    "writer_queue": 32,  # frames waiting to be written before the drop policy applies
+    "drop_policy": "oldest",  # when the queue is full: "oldest", "newest" or "block"
+    "stats_every": 60,  # print capture rate and writer stats every N captured frames (0 = never)
 }
 
 
@@ -26,27 +35,211 @@ class Logger:
         print(message)
 
 
-def save_numpy_image(screenshot_array):
-    timestamp = get_timestamp()
+def save_numpy_image(screenshot_array, timestamp=None, sequence=0):
+    if timestamp is None:
+        timestamp = get_timestamp()
     img = Image.fromarray(screenshot_array)
     os.makedirs(CONFIG["save_dir"], exist_ok=True)
-    fp = os.path.join(CONFIG["save_dir"], f"screenshot_{timestamp}.png")
+    # nanosecond timestamp plus sequence number, so frames captured within the same second never collide
+    fp = os.path.join(CONFIG["save_dir"], f"screenshot_{timestamp}_{sequence:06d}.png")
     print(fp)
     img.save(fp)
 
 def get_timestamp():
-    ts = int(time.time())
+    ts = time.time_ns()
     return ts
 
+
+class TickScheduler:
+    """
+    Fires at fixed ticks of ``interval`` seconds on the monotonic clock.
+
+    Each tick is scheduled from the start time rather than from the end of
+    the previous capture, so capture and bookkeeping time never accumulate
+    as drift. Ticks that have already passed when a capture overruns are
+    skipped and counted in ``missed``.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.start = None
+        self.tick = 0
+        self.missed = 0
+
+    def wait(self):
+        """Sleep until the next tick"""
+        now = time.monotonic()
+        if self.start is None:
+            self.start = now
+            return
+
+        self.tick += 1
+        target = self.start + self.tick * self.interval
+        if now < target:
+            time.sleep(target - now)
+            return
+
+        behind = int((now - target) // self.interval)
+        self.missed += behind
+        self.tick += behind
+
+    @property
+    def target_fps(self):
+        return 1 / self.interval
+
+    def achieved_fps(self, frames):
+        """Average capture rate since the first tick"""
+        if self.start is None:
+            return 0.0
+        elapsed = time.monotonic() - self.start
+        return frames / elapsed if elapsed > 0 else 0.0
+
+
+class AsyncFrameWriter:
+    """
+    Encodes and writes captured frames on a pool of writer threads.
+
+    The capture loop only enqueues frames, so PNG encoding never delays the
+    next capture. The queue is bounded; when it is full the drop policy
+    either discards the oldest waiting frame, discards the new frame, or
+    blocks the capture loop until a writer catches up (backpressure).
+    """
+
+    DROP_POLICIES = ("oldest", "newest", "block")
+
+    def __init__(self, save=save_numpy_image, workers=2, max_queue=32, drop_policy="oldest"):
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {self.DROP_POLICIES}, not {drop_policy!r}")
+        self.save = save
+        self.drop_policy = drop_policy
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+        self.write_seconds = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._write_loop, name=f"FrameWriter-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, frame, timestamp, sequence=0):
+        """Queue a frame for writing, applying the drop policy if the queue is full"""
+        with self._lock:
+            self.submitted += 1
+        item = (frame, timestamp, sequence)
+
+        if self.drop_policy == "block":
+            start = time.perf_counter()
+            self._queue.put(item)
+            with self._lock:
+                self.blocked_seconds += time.perf_counter() - start
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    if self.drop_policy == "newest":
+                        with self._lock:
+                            self.dropped += 1
+                        return
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                        with self._lock:
+                            self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+        with self._lock:
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                frame, timestamp, sequence = item
+                start = time.perf_counter()
+                try:
+                    self.save(frame, timestamp, sequence)
+                except Exception as e:
+                    print(f"[!] Failed to write frame {timestamp}: {e}")
+                    with self._lock:
+                        self.failed += 1
+                    continue
+                with self._lock:
+                    self.written += 1
+                    self.write_seconds += time.perf_counter() - start
+            finally:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": self._queue.qsize(),
+                "max_depth": self.max_depth,
+                "blocked_seconds": round(self.blocked_seconds, 3),
+                "avg_write_ms": round(self.write_seconds / self.written * 1000, 2) if self.written else 0.0,
+            }
+
+    def close(self):
+        """Write every queued frame, then stop the writer threads"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
 def recorder_main():
-    emulator = GooglePlayEmulatorController(Logger())
+    # every tick must be a new capture, a shared cached frame would be recorded (or deduplicated) again
+    emulator = GooglePlayEmulatorController(Logger(), frame_cache_max_age=0)
     emulator.start()
     input("Ready to record? Press Enter to continue...")
 
-    while 1:
-        image = emulator.screenshot()
-        time.sleep(CONFIG["save_rate"])
-        save_numpy_image(image)
+    dedup = DedupIndex(threshold=CONFIG["dedup_threshold"]) if CONFIG["dedup"] else None
+    writer = AsyncFrameWriter(
+        workers=CONFIG["writer_threads"],
+        max_queue=CONFIG["writer_queue"],
+        drop_policy=CONFIG["drop_policy"],
+    )
+
+    scheduler = TickScheduler(CONFIG["save_rate"])
+
+    def report():
+        print(
+            f"Capture rate: {scheduler.achieved_fps(captured):.2f} fps (target {scheduler.target_fps:.2f}), "
+            f"{scheduler.missed} ticks missed | Writer stats: {writer.stats()}"
+        )
+
+    captured = 0
+    try:
+        while 1:
+            scheduler.wait()
+            image = emulator.screenshot()
+            timestamp = get_timestamp()
+            captured += 1
+            if CONFIG["stats_every"] and captured % CONFIG["stats_every"] == 0:
+                report()
+            if dedup is not None and dedup.check(image) is not None:
+                continue
+            writer.submit(image, timestamp, captured)
+    finally:
+        writer.close()
+        report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from os.path import abspath, dirname, join
+
+import cv2
+import numpy as np
+
+from image_handler import build_pyramid, open_from_path
+
+REFERENCE_ROOT = abspath(join(dirname(__file__), "reference_images"))
+
+# sidecar file mapping template names to the [x1, y1, x2, y2] screen area they appear in
+REGIONS_FILE = "regions.json"
+
+
+class TemplateSet:
+    """Pre-processed reference images of one folder"""
+
+    def __init__(
+        self,
+        folder: str,
+        names: list[str],
+        templates: list[np.ndarray],
+        signature: tuple,
+        regions: list[tuple[int, int, int, int] | None] | None = None,
+    ):
+        self.folder = folder
+        self.names = names
+        self.templates = templates
+        self.signature = signature
+        self.regions = regions if regions is not None else [None] * len(names)
+        self.nbytes = sum(template.nbytes for template in templates)
+        # folder mtime and time.monotonic() of the last full signature check, see TemplateLibrary.get
+        self.folder_mtime_ns = 0
+        self.checked_at = float("-inf")
+        self._pyramids: dict[tuple[int, int], list[np.ndarray]] = {}
+
+    def pyramid(self, index: int, levels: int) -> list[np.ndarray]:
+        """Returns the downscaled pyramid of one template, building it on first use"""
+        key = (index, levels)
+        pyramid = self._pyramids.get(key)
+        if pyramid is None:
+            pyramid = build_pyramid(self.templates[index], levels)
+            self._pyramids[key] = pyramid
+        return pyramid
+
+
+class TemplateLibrary:
+    """
+    Process-wide cache of reference images, keyed by folder.
+
+    Each folder is read and decoded once and kept as grayscale, C-contiguous
+    templates ready for cv2.matchTemplate. A lookup only stats the folder
+    itself: adding, removing or renaming a file changes its mtime and the
+    folder is rescanned right away. Files rewritten in place do not touch
+    the folder, so every file is re-checked at most once per
+    ``check_interval`` seconds. A folder is reloaded when any of its files
+    changed, and the least recently used folders are evicted once the cache
+    grows past ``max_bytes``.
+
+    A folder may carry a ``regions.json`` index of the screen area each
+    template appears in (see tools/region_learner.py); the matcher crops
+    its search to that area.
+    """
+
+    def __init__(self, root: str = REFERENCE_ROOT, max_bytes: int = 64 * 1024 * 1024, check_interval: float = 2.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+
+        self._sets: OrderedDict[str, TemplateSet] = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _signature(self, reference_folder: str) -> tuple:
+        """Returns (name, mtime, size) of every template file and the regions index, sorted by name"""
+        with os.scandir(reference_folder) as entries:
+            return tuple(
+                sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in entries
+                    if entry.name.endswith(".png") or entry.name.endswith(".jpg") or entry.name == REGIONS_FILE
+                )
+            )
+
+    @staticmethod
+    def _load_regions(reference_folder: str) -> dict[str, tuple[int, int, int, int]]:
+        path = join(reference_folder, REGIONS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as regions_file:
+            return {name: tuple(int(value) for value in region) for name, region in json.load(regions_file).items()}
+
+    def get(self, folder: str) -> TemplateSet:
+        """Returns the templates of a folder, loading them if missing or out of date
+
+        Args:
+            folder: folder within the reference image root
+
+        Returns:
+            TemplateSet: template names and grayscale templates in name order
+        """
+        reference_folder = join(self.root, folder)
+        folder_mtime_ns = os.stat(reference_folder).st_mtime_ns
+        now = time.monotonic()
+
+        with self._lock:
+            template_set = self._sets.get(folder)
+            if (
+                template_set is not None
+                and template_set.folder_mtime_ns == folder_mtime_ns
+                and now - template_set.checked_at < self.check_interval
+            ):
+                self._sets.move_to_end(folder)
+                return template_set
+
+        signature = self._signature(reference_folder)
+        with self._lock:
+            template_set = self._sets.get(folder)
+            if template_set is not None and template_set.signature == signature:
+                template_set.folder_mtime_ns = folder_mtime_ns
+                template_set.checked_at = now
+                self._sets.move_to_end(folder)
+                return template_set
+
+        names = [name for name, _, _ in signature if name != REGIONS_FILE]
+        templates = [
+            np.ascontiguousarray(cv2.cvtColor(open_from_path(join(reference_folder, name)), cv2.COLOR_RGB2GRAY))
+            for name in names
+        ]
+        regions = self._load_regions(reference_folder)
+        template_set = TemplateSet(folder, names, templates, signature, [regions.get(name) for name in names])
+        template_set.folder_mtime_ns = folder_mtime_ns
+        template_set.checked_at = now
+
+        with self._lock:
+            self.loads += 1
+            self._sets[folder] = template_set
+            self._sets.move_to_end(folder)
+            self._evict()
+        return template_set
+
+    def _evict(self):
+        total = sum(template_set.nbytes for template_set in self._sets.values())
+        # never evict the most recently used folder, even if it alone exceeds the bound
+        while total > self.max_bytes and len(self._sets) > 1:
+            _, evicted = self._sets.popitem(last=False)
+            total -= evicted.nbytes
+
+    def invalidate(self, folder: str | None = None):
+        """Drops one folder, or every folder if none is given, from the cache"""
+        with self._lock:
+            if folder is None:
+                self._sets.clear()
+            else:
+                self._sets.pop(folder, None)
+
+
+template_library = TemplateLibrary()
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# clashbot modules import each other flat, as when run from the clashbot folder
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+sys.path.insert(0, str(Path(__file__).parent))
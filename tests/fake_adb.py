@@ -0,0 +1,161 @@
+import shutil
+import socket
+import subprocess
+import threading
+
+
+class FakeAdbServer:
+    """
+    Minimal adb server speaking the smart-socket protocol, for tests.
+
+    Serves ``host:devices`` for the given serials, ``host:transport:<serial>``
+    followed by ``exec:sh`` (backed by a real ``sh``) or ``exec:<command>``
+    (answered from ``exec_payloads``). ``hang_up_on`` makes a shell session
+    run the command containing that text and then close without answering,
+    like a connection lost while a command is in flight.
+    """
+
+    def __init__(self, serials=("emulator-5554",), exec_payloads: dict | None = None):
+        self.serials = list(serials)
+        self.exec_payloads = dict(exec_payloads or {})
+        self.hang_up_on: str | None = None
+        self.requests: list[tuple[str | None, str]] = []
+
+        self._shells: list[tuple[socket.socket, subprocess.Popen]] = []
+        self._lock = threading.Lock()
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._server.close()
+        self.drop_shell_sessions()
+
+    def open_shell_sessions(self) -> int:
+        """Number of shell sessions still connected"""
+        with self._lock:
+            return len(self._shells)
+
+    def drop_shell_sessions(self):
+        """Close every open shell session from the server side"""
+        with self._lock:
+            shells, self._shells = self._shells, []
+        for conn, process in shells:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+            process.kill()
+            process.wait()
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data += chunk
+        return data
+
+    def _read_request(self, conn: socket.socket) -> str:
+        length = int(self._recv_exact(conn, 4), 16)
+        return self._recv_exact(conn, length).decode("utf-8")
+
+    @staticmethod
+    def _fail(conn: socket.socket, message: str):
+        payload = message.encode("utf-8")
+        conn.sendall(b"FAIL" + f"{len(payload):04x}".encode("ascii") + payload)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        try:
+            request = self._read_request(conn)
+            if request == "host:devices":
+                self.requests.append((None, request))
+                payload = "".join(f"{serial}\tdevice\n" for serial in self.serials).encode("utf-8")
+                conn.sendall(b"OKAY" + f"{len(payload):04x}".encode("ascii") + payload)
+                conn.close()
+                return
+            if not request.startswith("host:transport:"):
+                self._fail(conn, f"unknown host service {request}")
+                conn.close()
+                return
+
+            serial = request[len("host:transport:") :]
+            if serial not in self.serials:
+                self._fail(conn, f"device '{serial}' not found")
+                conn.close()
+                return
+            conn.sendall(b"OKAY")
+
+            service = self._read_request(conn)
+            self.requests.append((serial, service))
+            if service == "exec:sh":
+                conn.sendall(b"OKAY")
+                self._run_shell(conn)
+            elif service.startswith("exec:"):
+                conn.sendall(b"OKAY")
+                conn.sendall(self.exec_payloads.get(service[len("exec:") :], b""))
+                conn.close()
+            else:
+                self._fail(conn, f"unknown service {service}")
+                conn.close()
+        except OSError:
+            conn.close()
+
+    def _run_shell(self, conn: socket.socket):
+        process = subprocess.Popen(
+            [shutil.which("sh")], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        with self._lock:
+            self._shells.append((conn, process))
+
+        def pump_output():
+            while True:
+                data = process.stdout.read1(65536)
+                if not data:
+                    return
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    return
+
+        pump = threading.Thread(target=pump_output, daemon=True)
+        pump.start()
+        try:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                if self.hang_up_on is not None and self.hang_up_on.encode("utf-8") in data:
+                    # let the command run, then drop the connection before its output is sent
+                    process.stdin.write(data.split(b"printf", 1)[0])
+                    process.stdin.close()
+                    process.wait()
+                    break
+                process.stdin.write(data)
+                process.stdin.flush()
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                if (conn, process) in self._shells:
+                    self._shells.remove((conn, process))
+            conn.close()
+            process.kill()
+            process.wait()
@@ -0,0 +1,56 @@
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from adb_controller import AdbController
+from fake_adb import FakeAdbServer
+from image_handler import RAW_FAILURES_BEFORE_PNG
+
+# a 6x4 framebuffer in RGB_888, a pixel format screencap can emit but the raw path does not read
+UNSUPPORTED_FRAMEBUFFER = struct.pack("<III", 6, 4, 3) + bytes(6 * 4 * 4)
+
+
+@pytest.fixture
+def server():
+    png = cv2.imencode(".png", np.full((4, 6, 3), 200, np.uint8))[1].tobytes()
+    with FakeAdbServer(exec_payloads={"screencap": UNSUPPORTED_FRAMEBUFFER, "screencap -p": png}) as server:
+        yield server
+
+
+def test_unreadable_raw_frames_fall_back_to_png(server):
+    controller = AdbController("emulator-5554", port=server.port, frame_cache_max_age=0)
+    for capture in range(RAW_FAILURES_BEFORE_PNG):
+        assert controller.screenshot().shape == (4, 6, 3)
+        expected_mode = "png" if capture == RAW_FAILURES_BEFORE_PNG - 1 else "raw"
+        assert controller.screenshot_mode == expected_mode
+    services = [service for _, service in server.requests]
+    # every raw capture was retried once before falling back to PNG for that frame
+    assert services.count("exec:screencap") == 2 * RAW_FAILURES_BEFORE_PNG
+    assert services.count("exec:screencap -p") == RAW_FAILURES_BEFORE_PNG
+
+
+def test_truncated_raw_frame_is_a_failed_capture(server):
+    server.exec_payloads["screencap"] = b"truncated"
+    controller = AdbController("emulator-5554", port=server.port, frame_cache_max_age=0)
+    with pytest.raises(RuntimeError, match="truncated"):
+        controller.screenshot()
+    assert controller.screenshot_mode == "raw"
+    assert controller.health.stats()["commands_failed"] == 1
+
+
+def test_lost_instance_is_probed_after_a_failure(server):
+    controller = AdbController("emulator-5554", port=server.port, frame_cache_max_age=0)
+    controller.health.probe_interval = 0
+    controller.screenshot()
+    controller.screenshot()
+    # liveness is unknown before the first capture only
+    assert controller.health.stats()["probes_fired"] == 1
+
+    server.serials.remove("emulator-5554")
+    with pytest.raises(RuntimeError, match="not found"):
+        controller.screenshot()
+    with pytest.raises(RuntimeError, match="not connected"):
+        controller.screenshot()
+    assert controller.health.stats()["probes_failed"] == 1
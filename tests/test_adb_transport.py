@@ -0,0 +1,77 @@
+import shutil
+import time
+
+import pytest
+
+from adb_transport import AdbTransport, AdbTransportError
+from fake_adb import FakeAdbServer
+
+needs_sh = pytest.mark.skipif(shutil.which("sh") is None, reason="the fake shell session needs sh")
+
+
+@pytest.fixture
+def server():
+    with FakeAdbServer(exec_payloads={"screencap": b"\x00\x01raw\xff"}) as server:
+        yield server
+
+
+@pytest.fixture
+def transport(server):
+    transport = AdbTransport("emulator-5554", port=server.port, timeout=5.0)
+    yield transport
+    transport.close()
+
+
+def test_host_devices(transport):
+    result = transport.host_service("host:devices")
+    assert result.stdout == "emulator-5554\tdevice\n"
+
+
+def test_exec_out_returns_raw_bytes(transport):
+    assert transport.exec_out("screencap").stdout == b"\x00\x01raw\xff"
+    assert transport.exec_out("screencap", binary_output=False).stdout == "\x00\x01raw�"
+
+
+def test_unknown_device_is_refused(server):
+    transport = AdbTransport("emulator-9999", port=server.port, timeout=5.0)
+    with pytest.raises(AdbTransportError, match="not found"):
+        transport.exec_out("screencap")
+
+
+@needs_sh
+def test_shell_exit_status_and_output(transport):
+    assert transport.shell("echo hello").stdout.strip() == "hello"
+    assert transport.shell("exit 3").returncode == 3
+    # the session survives a command exiting
+    assert transport.shell("true").returncode == 0
+
+
+@needs_sh
+def test_shell_state_does_not_leak(transport):
+    transport.shell("cd / && FOO=bar")
+    assert transport.shell('printf "%s" "$FOO"').stdout == ""
+    assert transport.shell("pwd").stdout.strip() != "/"
+
+
+@needs_sh
+def test_shell_reopens_session_dropped_while_idle(server, transport, tmp_path):
+    log = tmp_path / "ran"
+    transport.shell("true")
+    server.drop_shell_sessions()
+    time.sleep(0.1)
+
+    assert transport.shell(f"echo once >> {log}; echo done").stdout.strip() == "done"
+    assert log.read_text().splitlines() == ["once"]
+    assert [service for _, service in server.requests].count("exec:sh") == 2
+
+
+@needs_sh
+def test_shell_never_replays_a_delivered_command(server, transport, tmp_path):
+    log = tmp_path / "ran"
+    server.hang_up_on = "tap-marker"
+
+    with pytest.raises(AdbTransportError) as error:
+        transport.shell(f"echo once >> {log} # tap-marker")
+    assert error.value.delivered
+    assert log.read_text().splitlines() == ["once"]
+    assert [service for _, service in server.requests].count("exec:sh") == 1
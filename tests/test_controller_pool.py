@@ -0,0 +1,206 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+from controller_pool import AdbControllerFactory, ControllerPool, InstanceLauncher, InstanceLogger, TaskScheduler
+from fake_adb import FakeAdbServer
+
+SERIALS = ["emulator-5554", "emulator-5556"]
+
+needs_sh = pytest.mark.skipif(shutil.which("sh") is None, reason="the fake shell session needs sh")
+posix_only = pytest.mark.skipif(os.name != "posix", reason="checks process liveness with POSIX signals")
+
+# an "instance" that keeps a child process of its own alive, like an emulator and its helpers
+INSTANCE_COMMAND = [
+    sys.executable,
+    "-c",
+    "import subprocess, sys, time; "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); time.sleep(60)",
+]
+
+
+@pytest.fixture
+def server():
+    with FakeAdbServer(SERIALS) as server:
+        yield server
+
+
+@pytest.fixture
+def pool(server):
+    pool = ControllerPool(AdbControllerFactory(port=server.port), SERIALS)
+    yield pool
+    pool.close()
+
+
+# module level, so worker processes can unpickle them
+def connected_serial(controller, delay=0.0):
+    time.sleep(delay)
+    assert controller.is_connected()
+    return controller.adb_serial
+
+
+def shell_serial(controller):
+    controller.transport.shell("true")
+    return controller.adb_serial, os.getpid()
+
+
+def fail(controller):
+    raise RuntimeError(f"failed on {controller.adb_serial}")
+
+
+def test_serials_are_pooled_once(pool):
+    with pytest.raises(ValueError, match="already in the pool"):
+        pool.add(SERIALS[1])
+    pool.add("emulator-5558")
+    assert pool.serials() == SERIALS + ["emulator-5558"]
+
+
+def test_acquire_times_out_while_busy(pool):
+    with pool.acquire(SERIALS[0]) as controller:
+        assert controller.adb_serial == SERIALS[0]
+        assert pool.stats()[SERIALS[0]]["busy"]
+        with pytest.raises(TimeoutError):
+            with pool.acquire(SERIALS[0], timeout=0.1):
+                pass
+        # the other instance is still free
+        with pool.acquire(timeout=0.1) as other:
+            assert other.adb_serial == SERIALS[1]
+
+
+def test_threads_spread_tasks_over_instances(pool):
+    with TaskScheduler(pool) as scheduler:
+        results = scheduler.map(lambda controller, item: connected_serial(controller, 0.1), range(6))
+    assert set(results) == set(SERIALS)
+    stats = pool.stats()
+    assert sum(instance["tasks"] for instance in stats.values()) == 6
+    assert all(instance["tasks"] > 0 for instance in stats.values())
+
+
+def test_pinned_tasks_and_failures_are_counted(pool):
+    with TaskScheduler(pool) as scheduler:
+        pinned = [scheduler.submit(connected_serial, serial=SERIALS[1]) for _ in range(3)]
+        failed = scheduler.submit(fail, serial=SERIALS[0])
+        assert [future.result() for future in pinned] == [SERIALS[1]] * 3
+        with pytest.raises(RuntimeError, match=SERIALS[0]):
+            failed.result()
+    stats = pool.stats()
+    assert stats[SERIALS[1]]["tasks"] == 3
+    assert (stats[SERIALS[0]]["tasks"], stats[SERIALS[0]]["failures"]) == (1, 1)
+
+
+def test_instance_logger_retries_temporary_action():
+    called = threading.Event()
+    InstanceLogger(SERIALS[0], retry_interval=0.01).show_temporary_action("lost", "Retry", called.set)
+    assert called.wait(5)
+
+
+@needs_sh
+def test_processes_run_through_the_pool_and_stop_their_controllers(server, pool):
+    with TaskScheduler(pool, processes=True) as scheduler:
+        results = [scheduler.submit(shell_serial, serial=serial) for serial in SERIALS for _ in range(2)]
+        results = [future.result(timeout=60) for future in results]
+        with pytest.raises(RuntimeError, match=SERIALS[1]):
+            scheduler.submit(fail, serial=SERIALS[1]).result(timeout=60)
+        assert server.open_shell_sessions() == 2
+
+    pids = {serial: {pid for result_serial, pid in results if result_serial == serial} for serial in SERIALS}
+    # one worker process per instance, none of them this one
+    assert all(len(worker_pids) == 1 for worker_pids in pids.values())
+    assert pids[SERIALS[0]] != pids[SERIALS[1]]
+    assert os.getpid() not in pids[SERIALS[0]] | pids[SERIALS[1]]
+
+    stats = pool.stats()
+    assert (stats[SERIALS[0]]["tasks"], stats[SERIALS[0]]["failures"]) == (2, 0)
+    assert (stats[SERIALS[1]]["tasks"], stats[SERIALS[1]]["failures"]) == (3, 1)
+
+    # shutdown() stopped the worker controllers, closing their shell sessions
+    deadline = time.monotonic() + 5
+    while server.open_shell_sessions() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert server.open_shell_sessions() == 0
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def wait_until_dead(pid, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while is_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return not is_alive(pid)
+
+
+@posix_only
+def test_launcher_restarts_one_instance_without_touching_the_others():
+    launcher = InstanceLauncher({serial: INSTANCE_COMMAND for serial in SERIALS})
+    try:
+        pids = {serial: launcher.start(serial) for serial in SERIALS}
+        # already running, not booted twice
+        assert launcher.start(SERIALS[0]) == pids[SERIALS[0]]
+
+        restarted = launcher.restart(SERIALS[0])
+        assert restarted != pids[SERIALS[0]]
+        assert wait_until_dead(pids[SERIALS[0]])
+        assert launcher.is_running(SERIALS[0]) and is_alive(restarted)
+        # the other instance kept running
+        assert launcher.is_running(SERIALS[1]) and is_alive(pids[SERIALS[1]])
+    finally:
+        launcher.stop_all()
+    assert not any(launcher.is_running(serial) for serial in SERIALS)
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+@posix_only
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="lists child processes through /proc")
+def test_launcher_stops_the_whole_process_tree():
+    launcher = InstanceLauncher({SERIALS[0]: INSTANCE_COMMAND})
+    pid = launcher.start(SERIALS[0])
+    try:
+        deadline = time.monotonic() + 5
+        children = child_pids(pid)
+        while not children and time.monotonic() < deadline:
+            time.sleep(0.02)
+            children = child_pids(pid)
+        assert children
+    finally:
+        launcher.stop(SERIALS[0])
+    assert not launcher.is_running(SERIALS[0])
+    assert all(wait_until_dead(child) for child in children)
+
+
+@posix_only
+def test_pool_boots_and_restarts_its_instances(server):
+    launcher = InstanceLauncher({serial: INSTANCE_COMMAND for serial in SERIALS})
+    pool = ControllerPool(AdbControllerFactory(port=server.port), SERIALS, launcher=launcher, boot_timeout=5)
+    try:
+        pool.start()
+        pids = {serial: launcher._processes[serial].pid for serial in SERIALS}
+
+        assert pool.restart(SERIALS[1], timeout=1)
+        assert launcher._processes[SERIALS[1]].pid != pids[SERIALS[1]]
+        assert launcher._processes[SERIALS[0]].pid == pids[SERIALS[0]]
+        assert is_alive(pids[SERIALS[0]])
+
+        # the restart held the instance like acquire() does
+        assert pool.stats()[SERIALS[1]]["tasks"] == 1
+        with pool.acquire(SERIALS[1], timeout=1) as controller:
+            assert controller.is_connected()
+    finally:
+        pool.close(stop_instances=True)
+    assert not any(launcher.is_running(serial) for serial in SERIALS)
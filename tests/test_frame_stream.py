@@ -0,0 +1,124 @@
+import shutil
+import sys
+import textwrap
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("av")
+
+from adb_controller import AdbController
+from frame_stream import FrameStream
+
+# stands in for `adb exec-out screenrecord`: writes a raw H.264 stream to stdout, then idles
+SCREENRECORD = textwrap.dedent(
+    """
+    import sys, time
+    import av, numpy as np
+
+    output = av.open(sys.stdout.buffer, mode="w", format="h264")
+    stream = output.add_stream("libx264", rate=30)
+    stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+    stream.options = {"tune": "zerolatency"}
+    # enough frames for PyAV to finish probing the stream format
+    for index in range(300):
+        frame = av.VideoFrame.from_ndarray(np.full((48, 64, 3), index % 256, np.uint8), format="bgr24")
+        for packet in stream.encode(frame):
+            output.mux(packet)
+    sys.stdout.flush()
+    time.sleep(float(sys.argv[1]))
+    """
+)
+
+
+class FakeController:
+    def __init__(self):
+        self.screenshots = 0
+        self.clicks = 0
+
+    def screenshot(self):
+        self.screenshots += 1
+        return np.zeros((48, 64, 3), np.uint8)
+
+    def click(self, x_coord, y_coord, clicks=1, interval=0.0):
+        self.clicks += 1
+
+    def invalidate_frame_cache(self):
+        pass
+
+
+def make_stream(idle_seconds: float, **kwargs) -> tuple[FrameStream, FakeController]:
+    controller = FakeController()
+    command = [sys.executable, "-c", SCREENRECORD, str(idle_seconds)]
+    return FrameStream(controller, command=command, **kwargs), controller
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.02)
+
+
+def test_serves_decoded_frames():
+    stream, controller = make_stream(30, max_frame_age=30)
+    try:
+        frame = stream.screenshot()
+        assert frame.shape == (48, 64, 3)
+        assert not frame.flags.writeable
+        assert stream.frames_decoded > 0
+        assert controller.screenshots == 0
+    finally:
+        stream.stop()
+
+
+def test_stale_frame_falls_back_to_controller():
+    stream, controller = make_stream(30, max_frame_age=0.2)
+    try:
+        stream.start()
+        wait_until(lambda: stream.frames_decoded > 0)
+        time.sleep(0.4)
+        stream.screenshot()
+        assert controller.screenshots == 1
+    finally:
+        stream.stop()
+
+
+def test_ended_session_does_not_serve_its_last_frame():
+    stream, controller = make_stream(0, restart_delay=30, max_frame_age=30)
+    try:
+        stream.start()
+        wait_until(lambda: stream.stream_restarts > 0)
+        assert stream.frames_decoded > 0
+        assert stream.latest() is None
+        stream.screenshot()
+        assert controller.screenshots == 1
+    finally:
+        stream.stop()
+
+
+def test_frames_decoded_before_a_click_are_not_served_after_it():
+    stream, controller = make_stream(30, max_frame_age=30)
+    try:
+        stream.start()
+        wait_until(lambda: stream.frames_decoded > 0)
+        # let the decoder drain what screenrecord wrote before it went idle
+        time.sleep(0.5)
+        stream.screenshot()
+        assert controller.screenshots == 0
+
+        # the screen stays the same, so screenrecord emits nothing after the click
+        stream.click(10, 10)
+        stream.screenshot()
+        assert (controller.clicks, controller.screenshots) == (1, 1)
+    finally:
+        stream.stop()
+
+
+def test_screenrecord_runs_on_the_controllers_adb_server(monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: f"/usr/bin/{name}")
+    controller = AdbController("emulator-5556", host="10.0.0.2", port=5038)
+    stream = FrameStream(controller)
+    assert stream.command[:7] == ["/usr/bin/adb", "-H", "10.0.0.2", "-P", "5038", "-s", "emulator-5556"]
@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+import image_rec
+from image_rec import _match_pyramid, _match_region, _search_window, build_pyramid, compare_images
+
+
+def test_region_outside_subcrop_gives_empty_window():
+    image = np.zeros((200, 300), np.uint8)
+    # a region above and left of a subcrop starting at (200, 300)
+    window = _search_window(image, (50, 100, 80, 130), origin=(200, 300))
+    assert window[2] <= window[0] and window[3] <= window[1]
+
+    image[:20, :20] = 255
+    template = np.zeros((10, 10), np.uint8)
+    template[:5, :5] = 255
+    ys, xs, score, _ = _match_region(image, template, 0.5, window)
+    assert len(ys) == 0 and score == float("-inf")
+
+
+def test_region_window_is_clipped_to_the_image():
+    image = np.zeros((200, 300), np.uint8)
+    assert _search_window(image, (290, 190, 400, 260), origin=(0, 0)) == (282, 182, 300, 200)
+
+
+def make_ui_image(rng, shape=(240, 320)):
+    """Flat panels with outlines on a gradient, like a game menu"""
+    image = np.empty(shape, np.uint8)
+    image[:] = np.linspace(40, 120, shape[0], dtype=np.uint8)[:, None]
+    for _ in range(25):
+        x, y = int(rng.integers(0, shape[1] - 20)), int(rng.integers(0, shape[0] - 20))
+        w, h = int(rng.integers(12, 80)), int(rng.integers(8, 50))
+        cv2.rectangle(image, (x, y), (x + w, y + h), int(rng.integers(0, 256)), -1)
+        cv2.rectangle(image, (x, y), (x + w, y + h), 255, 1)
+    return image
+
+
+def full_resolution_hits(image, template, threshold):
+    res = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+    return set(zip(*(coordinates.tolist() for coordinates in np.nonzero(res >= threshold))))
+
+
+def test_pyramid_hits_are_full_resolution_hits():
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        image = make_ui_image(rng)
+        y, x = int(rng.integers(0, image.shape[0] - 32)), int(rng.integers(0, image.shape[1] - 32))
+        template = image[y : y + 32, x : x + 32].copy()
+        ys, xs, _, _ = _match_pyramid(build_pyramid(image, 2), build_pyramid(template, 2), 0.8)
+        full = full_resolution_hits(image, template, 0.8)
+        # refined hits are exact, never shifted by the coarse level
+        assert set(zip(ys.tolist(), xs.tolist())) <= full
+        assert (y, x) in full
+
+
+def test_pyramid_finds_the_exact_location():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        image = cv2.GaussianBlur(rng.integers(0, 256, (240, 320), dtype=np.uint8), (5, 5), 0)
+        y, x = int(rng.integers(0, image.shape[0] - 32)), int(rng.integers(0, image.shape[1] - 32))
+        template = image[y : y + 32, x : x + 32]
+        assert compare_images(image, template, threshold=0.95, pyramid_levels=2) == [y, x]
+
+
+def test_pyramid_miss_skips_the_full_resolution_search(monkeypatch):
+    image = make_ui_image(np.random.default_rng(2))
+    # a checkerboard icon that appears nowhere on the flat panels
+    template = np.kron(np.indices((4, 4)).sum(axis=0) % 2, np.ones((8, 8))).astype(np.uint8) * 255
+    full_searches = []
+    match_rows = image_rec._match_rows
+    monkeypatch.setattr(image_rec, "_match_rows", lambda *args: full_searches.append(args) or match_rows(*args))
+
+    ys, _, _, _ = _match_pyramid(build_pyramid(image, 2), build_pyramid(template, 2), 0.8)
+    assert len(ys) == 0
+    assert not full_searches
@@ -0,0 +1,58 @@
+import json
+
+from navigation_stats import NavigationStats
+from navigator import Navigator
+
+GRAPH = {
+    "main_menu": [{"to": "shop", "coordinates": [10, 10]}, {"to": "clan", "coordinates": [20, 20]}],
+    "clan": [{"to": "shop", "coordinates": [30, 30]}],
+}
+
+
+def saved_edges(path):
+    with open(path) as stats_file:
+        return json.load(stats_file)["edges"]
+
+
+def test_saves_are_batched(tmp_path):
+    path = tmp_path / "navigation_stats.json"
+    stats = NavigationStats(str(path), save_interval=3600)
+    stats.record("main_menu", "shop", 1.0)
+    assert saved_edges(path)["main_menu"]["shop"]["count"] == 1
+
+    stats.record("main_menu", "shop", 2.0)
+    stats.record("main_menu", "clan", 0.5)
+    assert "clan" not in saved_edges(path)["main_menu"]
+    stats.flush()
+    assert saved_edges(path)["main_menu"]["shop"]["count"] == 2
+    assert saved_edges(path)["main_menu"]["clan"]["count"] == 1
+
+
+def test_saves_merge_observations_from_other_processes(tmp_path):
+    path = str(tmp_path / "navigation_stats.json")
+    first = NavigationStats(path, autosave=False)
+    second = NavigationStats(path, autosave=False)
+    first.record("main_menu", "shop", 1.0)
+    second.record("main_menu", "clan", 2.0)
+    first.save()
+    second.save()
+
+    edges = saved_edges(path)["main_menu"]
+    assert (edges["shop"]["count"], edges["clan"]["count"]) == (1, 1)
+    assert second.latency("main_menu", "shop") == 1.0
+
+
+def test_routes_are_replanned_only_when_a_latency_moves(tmp_path):
+    navigator = Navigator(GRAPH, stats=NavigationStats(str(tmp_path / "stats.json"), autosave=False))
+    assert navigator.next_edge("main_menu", "shop").target == "shop"
+
+    # close to the default latency the routes were planned with
+    navigator.record_transition("main_menu", "shop", 1.1)
+    assert not navigator._stale
+
+    navigator.record_transition("main_menu", "shop", 20.0)
+    assert navigator._stale
+    navigator.record_transition("main_menu", "shop", 20.0)
+    navigator.record_transition("main_menu", "shop", 20.0)
+    assert navigator.next_edge("main_menu", "shop").target == "clan"
+    assert not navigator._stale
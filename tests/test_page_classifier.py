@@ -0,0 +1,50 @@
+import numpy as np
+
+from page_classifier import PageClassifier, PageDecisionTree
+
+FINGERPRINTS = {
+    "main_menu": [[0, 0, 200, 200, 200], [5, 5, 50, 50, 50]],
+    "shop": [[0, 0, 30, 30, 30], [5, 5, 220, 220, 220]],
+}
+
+
+def make_tree(classifier=None):
+    # one test: channel 0 of pixel (0, 0) above 100 leads to main_menu, else shop
+    return PageDecisionTree(
+        xs=np.array([0, 0, 0]),
+        ys=np.array([0, 0, 0]),
+        channels=np.array([0, 0, 0]),
+        thresholds=np.array([100, 0, 0]),
+        left=np.array([2, -1, -1]),
+        right=np.array([1, -1, -1]),
+        leaves=np.array([-1, 0, 1]),
+        classes=[("main_menu",), ("shop",)],
+        classifier=classifier,
+    )
+
+
+def make_frame(corner, center):
+    frame = np.zeros((10, 10, 3), np.uint8)
+    frame[0, 0] = corner
+    frame[5, 5] = center
+    return frame
+
+
+def test_tree_leaf_labels_are_confirmed_by_their_fingerprint():
+    tree = make_tree(PageClassifier(FINGERPRINTS))
+    assert tree.classify(make_frame(200, 50)) == ["main_menu"]
+    assert tree.classify(make_frame(30, 220)) == ["shop"]
+
+    # a transition frame that reaches the main_menu leaf but is not the main menu
+    unseen = make_frame(200, 220)
+    assert make_tree().classify(unseen) == ["main_menu"]
+    assert tree.classify(unseen) == []
+    assert tree.depth(unseen) == 1
+
+
+def test_expectation_leaves_ambiguous_matches_to_a_full_classification():
+    classifier = PageClassifier({**FINGERPRINTS, "popup": [[0, 0, 200, 200, 200]]})
+    frame = make_frame(200, 50)
+    assert classifier.expectation(["main_menu", "popup"]).matching(frame) == ["main_menu", "popup"]
+    assert classifier.expectation(["main_menu", "popup"]).check(frame) is None
+    assert classifier.expectation(["main_menu", "shop"]).check(frame) == "main_menu"
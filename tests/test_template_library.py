@@ -0,0 +1,43 @@
+import os
+
+import cv2
+import numpy as np
+
+from template_library import TemplateLibrary
+
+
+def write_template(folder, name, value):
+    cv2.imwrite(str(folder / name), np.full((8, 8, 3), value, np.uint8))
+
+
+def test_lookups_stat_only_the_folder(tmp_path, monkeypatch):
+    (tmp_path / "icons").mkdir()
+    write_template(tmp_path / "icons", "a.png", 10)
+    library = TemplateLibrary(root=str(tmp_path), check_interval=60)
+    assert library.get("icons").names == ["a.png"]
+
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+    for _ in range(5):
+        library.get("icons")
+    assert not scans and library.loads == 1
+
+    # a new file changes the folder's mtime, so it shows up right away
+    write_template(tmp_path / "icons", "b.png", 20)
+    os.utime(tmp_path / "icons", ns=(0, os.stat(tmp_path / "icons").st_mtime_ns + 1))
+    assert library.get("icons").names == ["a.png", "b.png"]
+    assert library.loads == 2
+
+
+def test_files_rewritten_in_place_reload_after_the_interval(tmp_path):
+    (tmp_path / "icons").mkdir()
+    write_template(tmp_path / "icons", "a.png", 10)
+    library = TemplateLibrary(root=str(tmp_path), check_interval=0)
+    assert library.get("icons").templates[0][0, 0] == 10
+
+    folder_mtime_ns = os.stat(tmp_path / "icons").st_mtime_ns
+    write_template(tmp_path / "icons", "a.png", 200)
+    os.utime(tmp_path / "icons" / "a.png", ns=(0, folder_mtime_ns + 1))
+    os.utime(tmp_path / "icons", ns=(0, folder_mtime_ns))
+    assert library.get("icons").templates[0][0, 0] == 200
@@ -5,6 +5,7 @@ import os
 import csv
 import random
 from pathlib import Path
+from training_pack import load_image
 
 class ImageClassifier:
     def __init__(self, root):
@@ -148,7 +149,7 @@ class ImageClassifier:
 
         # Load and display image
         image_path = os.path.join(self.images_folder, self.images[self.current_index])
-        image = Image.open(image_path)
+        image = load_image(image_path)
 
         # Convert BGR to RGB if needed
         if image.mode == 'RGB':
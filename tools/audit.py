@@ -1,12 +1,50 @@
 import csv
 import os
-import ast
-from PIL import Image
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+from fingerprint_model import load_fingerprints
+from page_classifier import PageClassifier
+from training_pack import load_frame, load_image
+
+# Fingerprint pixel coordinates, set once per audit worker process
+_worker_xs = None
+_worker_ys = None
+
+
+def _init_worker(xs, ys):
+    global _worker_xs, _worker_ys
+    _worker_xs, _worker_ys = xs, ys
+
+
+def _sample_image(image_path):
+    """Load one image (from the training pack when possible) and gather every fingerprint pixel with one index
+
+    Returns:
+        (values, inside, error): (pixels, 3) channel values in PIL order, which
+        pixels lie inside the image, and an error message if the image could not be read
+    """
+    try:
+        frame = load_frame(image_path)
+    except Exception as e:
+        return None, None, f"Error processing image {image_path}: {e}"
+    if frame is None:
+        return None, None, None
+
+    inside = (_worker_xs >= 0) & (_worker_ys >= 0) & (_worker_xs < frame.shape[1]) & (_worker_ys < frame.shape[0])
+    values = np.zeros((len(_worker_xs), 3), dtype=np.uint8)
+    values[inside] = frame[_worker_ys[inside], _worker_xs[inside]]
+    return values, inside, None
+
+
 class ImageClassifierAudit:
-    def __init__(self, tolerance=20):
+    def __init__(self, tolerance=20, workers=None):
         self.tolerance = tolerance
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
 
         # Get the project root (parent of tools/)
         script_dir = Path(__file__).parent
@@ -20,20 +58,19 @@ class ImageClassifierAudit:
         # Load data
         self.pixel_references = self.load_pixel_references()
         self.labeled_images = self.load_labeled_images()
+        self.classifier = PageClassifier.from_model(self.fingerprints, tolerance=tolerance)
+
+        # Filled by evaluate(): one row per image, see evaluate() for the columns
+        self.image_names = []
+        self.image_index = {}
+        self.image_found = None
+        self.pixel_matrix = None
+        self.label_matrix = None
 
     def load_pixel_references(self):
-        """Load pixel reference data from page_rec_pixels.csv"""
-        pixel_refs = {}
-        if os.path.exists(self.pixel_data_file):
-            with open(self.pixel_data_file, 'r', newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if row and len(row) >= 2:
-                        label = row[0]
-                        # Parse the string representation of the list
-                        pixel_data = ast.literal_eval(row[1])
-                        pixel_refs[label] = pixel_data
-        return pixel_refs
+        """Load pixel reference data from page_rec_pixels.csv (via its binary model)"""
+        self.fingerprints = load_fingerprints(self.pixel_data_file)
+        return self.fingerprints.as_dict()
 
     def load_labeled_images(self):
         """Load labeled images from annotations.csv, grouped by label"""
@@ -62,7 +99,7 @@ class ImageClassifierAudit:
         """Check if an image matches all reference pixels within tolerance"""
         try:
             # Load image
-            img = Image.open(image_path)
+            img = load_image(image_path)
 
             # Check each reference pixel
             for ref_pixel in reference_pixels:
@@ -91,6 +128,72 @@ class ImageClassifierAudit:
             print(f"Error processing image {image_path}: {e}")
             return False
 
+    def sample_images(self, image_names):
+        """Gather the fingerprint pixels of every image, decoding them in a process pool"""
+        paths = [os.path.join(self.images_folder, image_name) for image_name in image_names]
+        xs, ys = self.classifier.xs, self.classifier.ys
+
+        if self.workers > 1 and len(paths) > 1:
+            chunksize = max(1, len(paths) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(xs, ys)) as pool:
+                return list(pool.map(_sample_image, paths, chunksize=chunksize))
+
+        _init_worker(xs, ys)
+        return [_sample_image(path) for path in paths]
+
+    def evaluate(self):
+        """Check every fingerprint pixel of every label against every annotated image
+
+        Builds, with one row per annotated image:
+            image_found: whether the image could be read
+            pixel_matrix: (images, fingerprint pixels) True where the pixel is within tolerance
+            label_matrix: (images, labels) True where every pixel of the label matches
+        """
+        self.image_names = sorted({name for images in self.labeled_images.values() for name in images})
+        self.image_index = {name: row for row, name in enumerate(self.image_names)}
+        pixel_count = len(self.classifier.xs)
+
+        values = np.zeros((len(self.image_names), pixel_count, 3), dtype=np.int16)
+        inside = np.zeros((len(self.image_names), pixel_count), dtype=bool)
+        self.image_found = np.zeros(len(self.image_names), dtype=bool)
+        for row, (image_values, image_inside, error) in enumerate(self.sample_images(self.image_names)):
+            if error:
+                print(error)
+            if image_values is not None:
+                values[row], inside[row] = image_values, image_inside
+                self.image_found[row] = True
+
+        # load_frame() values are already in the classifier's color order
+        within = np.abs(values - self.classifier.colors) <= self.tolerance
+        self.pixel_matrix = np.all(within, axis=2) & inside & self.image_found[:, None]
+
+        # count failed pixels per label with one matrix product instead of a loop over labels
+        label_of_pixel = np.zeros((pixel_count, len(self.classifier.labels)), dtype=np.int32)
+        label_of_pixel[np.arange(pixel_count), self.classifier.label_ids] = 1
+        failures = (~self.pixel_matrix).astype(np.int32) @ label_of_pixel
+        self.label_matrix = (failures == 0) & self.image_found[:, None]
+
+    def confusion_matrix(self):
+        """Count, for each annotated label, the images matching each fingerprint
+
+        Returns:
+            (true_labels, fingerprint_labels, counts, unmatched): counts[i, j] is the number of
+            images annotated true_labels[i] that match fingerprint_labels[j]; unmatched[i] is
+            how many of them match no fingerprint at all
+        """
+        if self.label_matrix is None:
+            self.evaluate()
+
+        true_labels = sorted(self.labeled_images)
+        counts = np.zeros((len(true_labels), len(self.classifier.labels)), dtype=np.int64)
+        unmatched = np.zeros(len(true_labels), dtype=np.int64)
+        for i, label in enumerate(true_labels):
+            rows = [self.image_index[name] for name in self.labeled_images[label]]
+            matches = self.label_matrix[rows]
+            counts[i] = matches.sum(axis=0)
+            unmatched[i] = np.count_nonzero(~matches.any(axis=1))
+        return true_labels, list(self.classifier.labels), counts, unmatched
+
     def audit_label(self, label):
         """Audit all images for a specific label"""
         if label not in self.pixel_references:
@@ -99,7 +202,10 @@ class ImageClassifierAudit:
         if label not in self.labeled_images:
             return None
 
-        reference_pixels = self.pixel_references[label]
+        if self.label_matrix is None:
+            self.evaluate()
+
+        column = self.classifier.labels.index(label)
         images = self.labeled_images[label]
 
         correct = 0
@@ -107,16 +213,10 @@ class ImageClassifierAudit:
         failed_images = []
 
         for image_name in images:
-            image_path = os.path.join(self.images_folder, image_name)
-
-            if os.path.exists(image_path):
-                if self.classify_image(image_path, reference_pixels):
-                    correct += 1
-                else:
-                    incorrect += 1
-                    failed_images.append(image_name)
+            # missing or unreadable images never match
+            if self.label_matrix[self.image_index[image_name], column]:
+                correct += 1
             else:
-                # Image file not found
                 incorrect += 1
                 failed_images.append(image_name)
 
@@ -131,8 +231,109 @@ class ImageClassifierAudit:
             'failed_images': failed_images
         }
 
+    def print_confusion_matrix(self):
+        """Print annotated labels (rows) against the fingerprints they match (columns)"""
+        true_labels, fingerprint_labels, counts, unmatched = self.confusion_matrix()
+
+        print()
+        print("Confusion matrix (rows: annotated label, columns: matching fingerprint)")
+        print(" " * 25 + " | " + " | ".join(f"{j:>4}" for j in range(len(fingerprint_labels))) + " | none")
+        for i, label in enumerate(true_labels):
+            cells = " | ".join(f"{count:>4}" for count in counts[i])
+            print(f"{label:<25} | {cells} | {unmatched[i]:>4}")
+        for i, label in enumerate(fingerprint_labels):
+            print(f"  {i:>4}: {label}")
+
+    def collision_report(self):
+        """Find images that also match another label's fingerprint
+
+        Unlabeled ("Null") images are skipped, since they may legitimately show any page.
+
+        Returns:
+            list: (annotated label, colliding fingerprint label, image names), most collisions first
+        """
+        if self.label_matrix is None:
+            self.evaluate()
+
+        collisions = []
+        for label, images in self.labeled_images.items():
+            if label == "Null":
+                continue
+            rows = np.asarray([self.image_index[name] for name in images])
+            for column, other in enumerate(self.classifier.labels):
+                if other == label:
+                    continue
+                hits = np.flatnonzero(self.label_matrix[rows, column])
+                if len(hits):
+                    collisions.append((label, other, [images[i] for i in hits]))
+        collisions.sort(key=lambda collision: (-len(collision[2]), collision[0], collision[1]))
+        return collisions
+
+    def pixel_power(self, label):
+        """Measure how well each fingerprint pixel of a label separates it from other labels
+
+        Returns:
+            list: one dict per pixel with its [x, y, b, g, r] row, 'pass' (share of the label's
+            images where it matches), 'reject' (share of other labeled images it rules out) and
+            'unique' (other images ruled out by this pixel alone, which collide without it)
+        """
+        if self.label_matrix is None:
+            self.evaluate()
+
+        column = self.classifier.labels.index(label)
+        start, end = self.classifier.offsets[column], self.classifier.offsets[column + 1]
+        positives = np.asarray([self.image_index[name] for name in self.labeled_images.get(label, [])], dtype=np.intp)
+        negatives = np.asarray(
+            [
+                self.image_index[name]
+                for other, images in self.labeled_images.items()
+                if other not in (label, "Null")
+                for name in images
+            ],
+            dtype=np.intp,
+        )
+        positives = positives[self.image_found[positives]]
+        negatives = negatives[self.image_found[negatives]]
+
+        passes = self.pixel_matrix[positives, start:end]
+        rejects = ~self.pixel_matrix[negatives, start:end]
+        only_reject = rejects & (rejects.sum(axis=1, keepdims=True) == 1)
+
+        report = []
+        for offset, pixel in enumerate(self.pixel_references[label]):
+            report.append({
+                'pixel': pixel,
+                'pass': passes[:, offset].mean() * 100 if len(positives) else 0.0,
+                'reject': rejects[:, offset].mean() * 100 if len(negatives) else 0.0,
+                'unique': int(only_reject[:, offset].sum()),
+            })
+        return report
+
+    def print_cross_label_report(self):
+        """Print fingerprint collisions between labels and the discriminative power of each pixel"""
+        collisions = self.collision_report()
+
+        print()
+        print("Fingerprint collisions (annotated label -> also matches)")
+        if not collisions:
+            print("  none")
+        for label, other, images in collisions:
+            print(f"{label:<25} -> {other:<25} | {len(images):^6} | {images}")
+
+        print()
+        print("Pixel discriminative power (pass = matches own images, reject = rules out other labels)")
+        labels_to_report = sorted(set(self.pixel_references) & set(self.labeled_images))
+        for label in labels_to_report:
+            print(label)
+            for index, result in enumerate(self.pixel_power(label)):
+                x, y = result['pixel'][0], result['pixel'][1]
+                print(f"  {index:>3}: ({x:>3},{y:>3}) | pass {result['pass']:5.1f}% | "
+                      f"reject {result['reject']:5.1f}% | unique {result['unique']}")
+
     def run_audit(self):
         """Run audit for all labels and print results"""
+        self.evaluate()
+
         # Get all labels that have both pixel references and labeled images
         labels_to_audit = set(self.pixel_references.keys()) & set(self.labeled_images.keys())
 
@@ -147,6 +348,9 @@ class ImageClassifierAudit:
 
                 print(f"{label_str} | {correct_str} | {incorrect_str} | {percent_str} | {failed_str}")
 
+        self.print_confusion_matrix()
+        self.print_cross_label_report()
+
 def main():
     auditor = ImageClassifierAudit(tolerance=20)
     auditor.run_audit()
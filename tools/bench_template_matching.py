@@ -0,0 +1,152 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+import image_rec
+from image_handler import open_from_path
+from template_library import TemplateLibrary
+
+
+def legacy_find_references(image, reference_folder, tolerance=0.88):
+    """The original find_references: reload every template and spawn a pool per call"""
+    filenames = [name for name in os.listdir(reference_folder) if name.endswith(".png") or name.endswith(".jpg")]
+    reference_images = [open_from_path(os.path.join(reference_folder, name)) for name in filenames]
+
+    with ThreadPoolExecutor(max_workers=len(reference_images), thread_name_prefix="ImageRecognition") as executor:
+        futures = [
+            executor.submit(legacy_compare_images, image, template, tolerance) for template in reference_images
+        ]
+        results = [future.result() for future in as_completed(futures)]
+        return results, filenames
+
+
+def legacy_compare_images(image, template, threshold=0.8):
+    img_gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    template_gray = cv2.cvtColor(template, cv2.COLOR_RGB2GRAY)
+    if template_gray.shape[0] > img_gray.shape[0] or template_gray.shape[1] > img_gray.shape[1]:
+        return None
+    res = cv2.matchTemplate(img_gray, template_gray, cv2.TM_CCOEFF_NORMED)
+    loc = np.where(res >= threshold)
+    return None if len(loc[0]) != 1 else [int(loc[0][0]), int(loc[1][0])]
+
+
+def make_ui_screenshot(rng, shape=(633, 419, 3)):
+    """A synthetic UI frame: flat panels and buttons with text on a gradient background"""
+    height, width = shape[:2]
+    screenshot = np.empty(shape, dtype=np.uint8)
+    screenshot[:] = np.linspace(40, 120, height, dtype=np.uint8)[:, None, None]
+    for _ in range(40):
+        x, y = int(rng.integers(0, width - 20)), int(rng.integers(0, height - 20))
+        w, h = int(rng.integers(20, 160)), int(rng.integers(12, 80))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(screenshot, (x, y), (x + w, y + h), color, -1)
+        cv2.rectangle(screenshot, (x, y), (x + w, y + h), (255, 255, 255), 1)
+    for _ in range(30):
+        x, y = int(rng.integers(0, width - 60)), int(rng.integers(12, height))
+        text = "".join(chr(int(c)) for c in rng.integers(65, 91, int(rng.integers(2, 8))))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.putText(screenshot, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, float(rng.uniform(0.3, 0.8)), color, 1)
+    return screenshot
+
+
+def make_fixture(root, templates, template_size, seed=0, content="noise"):
+    """Write a synthetic screenshot's crops as reference images and return the screenshot"""
+    rng = np.random.default_rng(seed)
+    if content == "ui":
+        screenshot = make_ui_screenshot(rng)
+    else:
+        screenshot = rng.integers(0, 256, size=(633, 419, 3), dtype=np.uint8)
+        screenshot = cv2.GaussianBlur(screenshot, (5, 5), 0)
+
+    folder = os.path.join(root, "bench")
+    os.makedirs(folder, exist_ok=True)
+    for index in range(templates):
+        y = int(rng.integers(0, screenshot.shape[0] - template_size))
+        x = int(rng.integers(0, screenshot.shape[1] - template_size))
+        crop = screenshot[y : y + template_size, x : x + template_size]
+        cv2.imwrite(os.path.join(folder, f"template_{index:03d}.png"), crop)
+    return screenshot, folder
+
+
+def locations_agree(full, coarse, tolerance):
+    """True if both modes missed, or both found the template within tolerance pixels"""
+    if full is None or coarse is None:
+        return full is None and coarse is None
+    return max(abs(full[0] - coarse[0]), abs(full[1] - coarse[1])) <= tolerance
+
+
+def time_calls(function, repeats):
+    function()  # warm up caches and thread pools
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy, shared-pool and pyramid template matching")
+    parser.add_argument("--templates", type=int, default=24, help="reference images in the folder")
+    parser.add_argument("--size", type=int, default=32, help="template edge length in pixels")
+    parser.add_argument("--repeats", type=int, default=50, help="timed calls per variant")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="shared pool size")
+    parser.add_argument("--pyramid-levels", type=int, default=2, help="coarse-to-fine levels to compare (0 = skip)")
+    parser.add_argument("--content", choices=["noise", "ui", "both"], default="both",
+                        help="synthetic screenshot: blurred noise, flat UI panels with text, or one run of each")
+    args = parser.parse_args()
+
+    for content in (["noise", "ui"] if args.content == "both" else [args.content]):
+        run_benchmark(args, content)
+
+
+def run_benchmark(args, content):
+    with tempfile.TemporaryDirectory() as root:
+        screenshot, folder = make_fixture(root, args.templates, args.size, content=content)
+
+        image_rec.template_library = TemplateLibrary(root=root)
+        image_rec.set_matching_workers(args.workers)
+
+        legacy_results, legacy_names = legacy_find_references(screenshot, folder)
+        results, names = image_rec.find_references(screenshot, "bench")
+        # legacy results come back in completion order, so only the multiset is comparable
+        if sorted(legacy_results, key=str) != sorted(results, key=str):
+            print("[!] Warning: legacy and shared-pool results differ")
+
+        legacy = time_calls(lambda: legacy_find_references(screenshot, folder), args.repeats)
+        shared = time_calls(lambda: image_rec.find_references(screenshot, "bench"), args.repeats)
+
+        pyramid = None
+        if args.pyramid_levels > 0:
+            levels = args.pyramid_levels
+            pyramid_results, _ = image_rec.find_references(screenshot, "bench", pyramid_levels=levels)
+            mismatches = [
+                name
+                for name, full, coarse in zip(names, results, pyramid_results)
+                if not locations_agree(full, coarse, image_rec.PYRAMID_TOLERANCE)
+            ]
+            if mismatches:
+                print(f"[!] Warning: pyramid mode disagrees with full resolution on {mismatches}")
+            pyramid = time_calls(
+                lambda: image_rec.find_references(screenshot, "bench", pyramid_levels=levels),
+                args.repeats,
+            )
+
+    print(f"{args.templates} {content} templates of {args.size}px, {args.workers} shared workers, {args.repeats} calls")
+    print(f"{'legacy (pool per call)':<28} | {legacy * 1000:8.2f} ms/call")
+    print(f"{'shared pool + library':<28} | {shared * 1000:8.2f} ms/call")
+    print(f"{'speedup':<28} | {legacy / shared:8.2f}x")
+    if pyramid is not None:
+        print(f"{f'pyramid ({args.pyramid_levels} levels)':<28} | {pyramid * 1000:8.2f} ms/call")
+        print(f"{'pyramid speedup':<28} | {legacy / pyramid:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
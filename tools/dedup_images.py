@@ -0,0 +1,117 @@
+import argparse
+import csv
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+from frame_dedup import DedupIndex, frame_hash
+from training_pack import capture_order, load_frame
+
+
+class ImageDeduplicator:
+    """
+    Finds near-identical screenshots in the training folder.
+
+    Images are visited in capture order and the first of each run
+    of duplicates is kept. An annotated image is only dropped as a duplicate
+    of a kept image with the same label, so removing it never loses a label;
+    an unannotated image may be dropped as a duplicate of any kept image.
+    """
+
+    def __init__(self, threshold=4):
+        self.threshold = threshold
+
+        # Get the project root (parent of tools/)
+        script_dir = Path(__file__).parent
+        project_root = script_dir.parent
+
+        # Set paths relative to project root
+        self.images_folder = str(project_root / "data" / "training" / "images")
+        self.annotations_file = str(project_root / "data" / "training" / "annotations.csv")
+        self.duplicates_folder = str(project_root / "data" / "training" / "duplicates")
+
+    def load_annotations(self):
+        """Load annotation rows in file order"""
+        rows = []
+        if os.path.exists(self.annotations_file):
+            with open(self.annotations_file, 'r', newline='') as f:
+                reader = csv.reader(f)
+                rows = [row for row in reader if row]
+        return rows
+
+    def find_duplicates(self, labels):
+        """Returns {duplicate image: image it duplicates}"""
+        image_names = sorted(
+            (name for name in os.listdir(self.images_folder) if name.lower().endswith(('.png', '.jpg', '.jpeg'))),
+            key=capture_order,
+        ) if os.path.exists(self.images_folder) else []
+
+        every_image = DedupIndex(threshold=self.threshold)
+        by_label = {}
+        duplicates = {}
+
+        for image_name in image_names:
+            try:
+                frame = load_frame(os.path.join(self.images_folder, image_name))
+            except Exception as e:
+                print(f"Error processing image {image_name}: {e}")
+                continue
+            hash_bits = frame_hash(frame)
+            label = labels.get(image_name)
+
+            label_index = by_label.setdefault(label, DedupIndex(threshold=self.threshold))
+            original = every_image.find(hash_bits) if label is None else label_index.find(hash_bits)
+            if original is not None:
+                duplicates[image_name] = original
+                continue
+
+            every_image.add(hash_bits, image_name)
+            label_index.add(hash_bits, image_name)
+
+        return duplicates
+
+    def run(self, apply=False):
+        rows = self.load_annotations()
+        labels = {row[0]: row[1] for row in rows if len(row) >= 2}
+        duplicates = self.find_duplicates(labels)
+
+        for image_name, original in duplicates.items():
+            print(f"{image_name:<40} duplicates {original:<40} | {labels.get(image_name, 'unannotated')}")
+        print(f"Found {len(duplicates)} duplicate images (threshold {self.threshold} bits)")
+
+        if not apply:
+            print("Dry run, nothing changed (use --apply to move duplicates out and update annotations.csv)")
+            return duplicates
+
+        os.makedirs(self.duplicates_folder, exist_ok=True)
+        for image_name in duplicates:
+            shutil.move(os.path.join(self.images_folder, image_name), os.path.join(self.duplicates_folder, image_name))
+
+        if rows:
+            kept_rows = [row for row in rows if row[0] not in duplicates]
+            temporary = self.annotations_file + ".tmp"
+            with open(temporary, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerows(kept_rows)
+            os.replace(temporary, self.annotations_file)
+            print(f"Removed {len(rows) - len(kept_rows)} rows from {self.annotations_file}")
+
+        print(f"Moved {len(duplicates)} images to {self.duplicates_folder}")
+        return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and remove near-identical training screenshots")
+    parser.add_argument("--threshold", type=int, default=4, help="max differing hash bits (of 256) for duplicates")
+    parser.add_argument("--apply", action="store_true",
+                        help="move duplicates to data/training/duplicates and drop their annotations")
+    args = parser.parse_args()
+
+    ImageDeduplicator(threshold=args.threshold).run(apply=args.apply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+from fingerprint_model import FINGERPRINT_CSV, FingerprintModel, model_path_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert page_rec_pixels.csv to its binary .npz model and back")
+    parser.add_argument("--csv", default=FINGERPRINT_CSV, help="fingerprint csv")
+    parser.add_argument("--model", help="binary model (default: the csv path with an .npz suffix)")
+    parser.add_argument("--to-csv", action="store_true", help="rewrite the csv from the model instead")
+    args = parser.parse_args()
+
+    model_path = args.model or model_path_for(args.csv)
+    if args.to_csv:
+        model = FingerprintModel.load(model_path)
+        model.to_csv(args.csv)
+        print(f"Wrote {len(model.labels)} labels, {len(model.pixels)} pixels to {args.csv}")
+    else:
+        model = FingerprintModel.from_csv(args.csv)
+        model.save(model_path)
+        print(f"Wrote {len(model.labels)} labels, {len(model.pixels)} pixels to {model_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from PIL import Image, ImageTk, ImageDraw
 import os
 import csv
 import random
+from training_pack import load_image
 
 
 class NavigationMapper:
@@ -256,7 +257,7 @@ class NavigationMapper:
 
     def load_specific_screenshot(self, image_path):
         try:
-            self.current_screenshot = Image.open(image_path)
+            self.current_screenshot = load_image(str(image_path))
             self.display_screenshot()
             self.coord_label.config(text=f"Loaded: {image_path.name}")
         except Exception as e:
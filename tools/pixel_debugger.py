@@ -1,11 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from PIL import Image, ImageTk, ImageDraw
-import csv
 import os
-import ast
 from pathlib import Path
 from audit import ImageClassifierAudit
+from training_pack import load_image
+from fingerprint_model import load_fingerprints, model_path_for
 
 class PixelDebugger:
     def __init__(self, root):
@@ -29,6 +29,7 @@ class PixelDebugger:
         self.reference_pixels = []
         self.pixels_to_remove = set()  # Set of pixel indices to remove
         self.audit_results = {}
+        self.fingerprints = None  # FingerprintModel, loaded once per audit
         self.hide_marked_pixels = tk.BooleanVar(value=True)  # Hide marked pixels by default
         self.scale_x = 1.0  # Scale factor for display
         self.scale_y = 1.0
@@ -225,6 +226,7 @@ class PixelDebugger:
 
         try:
             auditor = ImageClassifierAudit(tolerance=self.tolerance)
+            self.fingerprints = auditor.fingerprints
 
             # Get all labels
             labels_to_audit = set(auditor.pixel_references.keys()) & set(auditor.labeled_images.keys())
@@ -280,13 +282,9 @@ class PixelDebugger:
 
     def load_pixel_references_for_label(self, label):
         """Load pixel references for a specific label"""
-        if os.path.exists(self.pixel_data_file):
-            with open(self.pixel_data_file, 'r', newline='') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if row and len(row) >= 2 and row[0] == label:
-                        return ast.literal_eval(row[1])
-        return []
+        if self.fingerprints is None:
+            return []
+        return self.fingerprints.label_pixels(label)
 
     def display_current_image(self):
         """Display the current failed image with pixel overlays"""
@@ -306,7 +304,7 @@ class PixelDebugger:
         )
 
         # Load image
-        img = Image.open(image_path)
+        img = load_image(image_path)
         display_img = img.copy()
         draw = ImageDraw.Draw(display_img)
 
@@ -480,30 +478,22 @@ class PixelDebugger:
             return
 
         try:
-            # Read all data
-            all_data = []
-            if os.path.exists(self.pixel_data_file):
-                with open(self.pixel_data_file, 'r', newline='') as f:
-                    reader = csv.reader(f)
-                    all_data = list(reader)
-
-            # Update the current label's pixels
-            for i, row in enumerate(all_data):
-                if row and row[0] == self.current_label:
-                    pixels = ast.literal_eval(row[1])
-                    # Remove selected pixels (in reverse order to maintain indices)
-                    for idx in sorted(self.pixels_to_remove, reverse=True):
-                        if 0 <= idx < len(pixels):
-                            del pixels[idx]
-
-                    # Update row
-                    all_data[i] = [self.current_label, str(pixels)]
-                    break
-
-            # Write back to file
-            with open(self.pixel_data_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerows(all_data)
+            # Re-read the fingerprints, pixel_extractor.py may have added rows since the audit
+            fingerprints = load_fingerprints(self.pixel_data_file)
+
+            # Remove the marked rows by value, so rows added since the audit do not shift them
+            marked = [self.reference_pixels[idx] for idx in self.pixels_to_remove
+                      if 0 <= idx < len(self.reference_pixels)]
+            pixels = fingerprints.label_pixels(self.current_label)
+            for pixel in marked:
+                if pixel in pixels:
+                    pixels.remove(pixel)
+            fingerprints.set_label_pixels(self.current_label, pixels)
+
+            # Write back to the CSV and regenerate the binary model
+            fingerprints.to_csv(self.pixel_data_file)
+            fingerprints.save(model_path_for(self.pixel_data_file))
+            self.fingerprints = fingerprints
 
             messagebox.showinfo("Success", f"Removed {len(self.pixels_to_remove)} pixel(s)")
 
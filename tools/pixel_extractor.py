@@ -1,9 +1,11 @@
 import tkinter as tk
+import numpy as np
 from PIL import Image, ImageTk, ImageDraw
 import csv
 import os
 import random
 from pathlib import Path
+from training_pack import load_frame
 
 class PixelExtractor:
     def __init__(self, root):
@@ -27,6 +29,7 @@ class PixelExtractor:
         # Current image data
         self.current_image_path = None
         self.current_image = None
+        self.current_frame = None  # decoded pixels of the original (un-swapped) image
         self.display_image = None
         self.photo = None
 
@@ -158,7 +161,8 @@ class PixelExtractor:
     def load_and_display_image(self):
         """Load and display the current image"""
         # Load original image
-        self.current_image = Image.open(self.current_image_path)
+        self.current_frame = load_frame(self.current_image_path)
+        self.current_image = Image.fromarray(np.array(self.current_frame))
 
         # Convert BGR to RGB for display
         if self.current_image.mode == 'RGB':
@@ -210,8 +214,7 @@ class PixelExtractor:
         # Ensure coordinates are within bounds
         if 0 <= orig_x < self.current_image.width and 0 <= orig_y < self.current_image.height:
             # Get pixel color from ORIGINAL image (before BGR to RGB conversion)
-            original_img = Image.open(self.current_image_path)
-            pixel = original_img.getpixel((orig_x, orig_y))
+            pixel = [int(value) for value in self.current_frame[orig_y, orig_x]]
 
             # Store as BGR (swap R and B from RGB)
             if len(pixel) >= 3:
@@ -0,0 +1,93 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+from image_rec import match_templates
+from template_library import REGIONS_FILE, template_library
+from training_pack import load_frame
+
+
+class RegionLearner:
+    def __init__(self, tolerance=0.88):
+        self.tolerance = tolerance
+
+        # Get the project root (parent of tools/)
+        script_dir = Path(__file__).parent
+        project_root = script_dir.parent
+
+        # Set paths relative to project root
+        self.images_folder = str(project_root / "data" / "training" / "images")
+        self.annotations_file = str(project_root / "data" / "training" / "annotations.csv")
+
+    def load_labeled_images(self):
+        """Load the names of every image with a real (non-Null) label"""
+        images = []
+        if os.path.exists(self.annotations_file):
+            with open(self.annotations_file, 'r', newline='') as f:
+                reader = csv.reader(f)
+                for row in reader:
+                    if row and len(row) >= 2 and row[1] != "Null":
+                        images.append(row[0])
+        return images
+
+    def learn_folder(self, folder, images):
+        """Match every template of a folder against every image and return their bounding regions"""
+        template_set = template_library.get(folder)
+        regions = {}
+
+        for image_name in images:
+            frame = load_frame(os.path.join(self.images_folder, image_name))
+            if frame is None:
+                continue
+
+            for index, match in enumerate(match_templates(frame, folder, self.tolerance, use_regions=False)):
+                if match.location is None:
+                    continue
+                height, width = template_set.templates[index].shape[:2]
+                y, x = match.location
+                found = [x, y, x + width, y + height]
+                if match.name in regions:
+                    region = regions[match.name]
+                    found = [min(region[0], found[0]), min(region[1], found[1]),
+                             max(region[2], found[2]), max(region[3], found[3])]
+                regions[match.name] = found
+
+        return regions
+
+    def run(self, folders, dry_run=False):
+        """Learn regions for each folder and write them to its regions.json"""
+        images = self.load_labeled_images()
+        print(f"Learning regions from {len(images)} labeled images")
+
+        for folder in folders:
+            regions = self.learn_folder(folder, images)
+            template_count = len(template_library.get(folder).names)
+            print(f"{folder:<25} | {len(regions):^5} / {template_count:^5} templates located | {regions}")
+
+            if dry_run:
+                continue
+            regions_path = os.path.join(template_library.root, folder, REGIONS_FILE)
+            with open(regions_path, 'w') as f:
+                json.dump(dict(sorted(regions.items())), f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn per-template search regions from labeled screenshots")
+    parser.add_argument("folders", nargs="*", help="reference image folders (default: all)")
+    parser.add_argument("--tolerance", type=float, default=0.88, help="matching threshold")
+    parser.add_argument("--dry-run", action="store_true", help="print regions without writing regions.json")
+    args = parser.parse_args()
+
+    folders = args.folders or sorted(
+        entry.name for entry in os.scandir(template_library.root) if entry.is_dir()
+    )
+    RegionLearner(tolerance=args.tolerance).run(folders, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Get the project root (parent of tools/)
+PROJECT_ROOT = Path(__file__).parent.parent
+IMAGES_FOLDER = str(PROJECT_ROOT / "data" / "training" / "images")
+ANNOTATIONS_FILE = str(PROJECT_ROOT / "data" / "training" / "annotations.csv")
+PACK_FOLDER = str(PROJECT_ROOT / "data" / "training" / "pack")
+
+FRAMES_FILE = "frames.u8"
+INDEX_FILE = "index.json"
+FRAMES_PATTERN = re.compile(r"frames(-\d+)?\.u8$")
+
+# screenshot_{seconds}.png (older recordings) or screenshot_{nanoseconds}_{sequence}.png
+TIMESTAMP_PATTERN = re.compile(r"screenshot_(\d+)(?:_(\d+))?\.")
+
+
+def parse_timestamp(image_name):
+    """Returns the capture time in seconds encoded in a recorder filename, or None"""
+    match = TIMESTAMP_PATTERN.match(os.path.basename(image_name))
+    if not match:
+        return None
+    if match.group(2) is not None:
+        return int(match.group(1)) / 1e9
+    return float(match.group(1))
+
+
+def capture_order(image_name):
+    """Sort key putting recorder filenames of either format in capture order"""
+    timestamp = parse_timestamp(image_name)
+    return (timestamp is None, timestamp or 0.0, image_name)
+
+
+def decode_frame(image_path):
+    """Decode an image file into the channel layout used by the pack"""
+    with Image.open(image_path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def load_annotations(annotations_file=ANNOTATIONS_FILE):
+    labels = {}
+    if os.path.exists(annotations_file):
+        with open(annotations_file, 'r', newline='') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if row and len(row) >= 2:
+                    labels[row[0]] = row[1]
+    return labels
+
+
+class TrainingPack:
+    """
+    Decoded training images in one memory-mapped file.
+
+    The frames file (frames.u8, or frames-<n>.u8 after a rebuild) holds every
+    frame back to back as height x width x 3 uint8 pixels, exactly as PIL
+    decodes the PNG (Image.open(...).convert("RGB")). index.json names that
+    file and maps each filename to its offset and shape in it, its label,
+    capture timestamp, and the size and mtime of the source PNG, so a frame
+    whose PNG changed after packing is never served stale.
+    """
+
+    def __init__(self, pack_folder=PACK_FOLDER):
+        self.pack_folder = pack_folder
+        self.entries = {}
+        self.frames = None
+        self.frames_file = FRAMES_FILE
+        self.index_mtime_ns = None
+
+        index_path = os.path.join(pack_folder, INDEX_FILE)
+        if os.path.exists(index_path):
+            self.index_mtime_ns = os.stat(index_path).st_mtime_ns
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            self.entries = index["frames"]
+            self.frames_file = index.get("frames_file", FRAMES_FILE)
+        frames_path = os.path.join(pack_folder, self.frames_file)
+        if os.path.exists(frames_path) and os.path.getsize(frames_path) > 0:
+            self.frames = np.memmap(frames_path, dtype=np.uint8, mode='r')
+
+    def __contains__(self, image_name):
+        return image_name in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def names(self):
+        return list(self.entries)
+
+    def label(self, image_name):
+        entry = self.entries.get(image_name)
+        return entry["label"] if entry else None
+
+    def timestamp(self, image_name):
+        entry = self.entries.get(image_name)
+        return entry["timestamp"] if entry else None
+
+    def frame(self, image_name, source_path=None):
+        """Returns a read-only view of a packed frame
+
+        Args:
+            image_name: filename of the image
+            source_path: if given, the frame is only returned while this file is unchanged
+
+        Returns:
+            np.ndarray | None: height x width x 3 frame, or None if not packed or out of date
+        """
+        entry = self.entries.get(image_name)
+        if entry is None or self.frames is None:
+            return None
+        if source_path is not None:
+            try:
+                stat = os.stat(source_path)
+            except OSError:
+                return None
+            if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+                return None
+        height, width = entry["shape"]
+        start = entry["offset"]
+        return self.frames[start : start + height * width * 3].reshape(height, width, 3)
+
+
+# Pack shared by every tool in this process, opened on first use
+_shared_pack = None
+
+
+def get_pack():
+    """The shared pack, re-opened whenever index.json changed (e.g. after build_pack in another process)"""
+    global _shared_pack
+    try:
+        index_mtime_ns = os.stat(os.path.join(PACK_FOLDER, INDEX_FILE)).st_mtime_ns
+    except OSError:
+        index_mtime_ns = None
+    if _shared_pack is None or _shared_pack.index_mtime_ns != index_mtime_ns:
+        _shared_pack = TrainingPack(PACK_FOLDER)
+    return _shared_pack
+
+
+def load_frame(image_path):
+    """Load an image as a height x width x 3 array, from the pack when possible
+
+    Falls back to decoding the file with PIL when the image is not packed or has
+    changed since packing. Returns None if the file does not exist.
+
+    Recorded screenshots are BGR arrays saved as if they were RGB, so PIL (and
+    the pack) yield the same channel order as emulator screenshots, and frames
+    from here can go straight to the classifiers and matchers.
+    """
+    frame = get_pack().frame(os.path.basename(image_path), source_path=image_path)
+    if frame is not None:
+        return frame
+    if not os.path.exists(image_path):
+        return None
+    return decode_frame(image_path)
+
+
+def load_image(image_path):
+    """Load an image as a PIL RGB image, from the pack when possible"""
+    frame = load_frame(image_path)
+    if frame is None:
+        raise FileNotFoundError(image_path)
+    return Image.fromarray(np.array(frame))
+
+
+def build_pack(images_folder=IMAGES_FOLDER, annotations_file=ANNOTATIONS_FILE, pack_folder=PACK_FOLDER,
+               rebuild=False):
+    """Add new or changed images to the pack and refresh every label
+
+    Frames already packed from an unchanged file are kept in place, so only
+    new images are decoded. Space left by changed or deleted images is
+    reclaimed with rebuild=True, which writes a new frames file instead of
+    truncating the one other tools may have memory-mapped. Old frames files
+    are deleted once nothing holds them open.
+
+    Returns:
+        tuple: (frames added, frames kept, frames dropped)
+    """
+    os.makedirs(pack_folder, exist_ok=True)
+    index_path = os.path.join(pack_folder, INDEX_FILE)
+
+    old_pack = TrainingPack(pack_folder)
+    old_entries = {} if rebuild else old_pack.entries
+    # appending never disturbs existing readers, a rebuild goes to a file no reader has open
+    frames_file = f"frames-{time.time_ns()}.u8" if rebuild else old_pack.frames_file
+    frames_path = os.path.join(pack_folder, frames_file)
+    del old_pack
+    labels = load_annotations(annotations_file)
+    image_names = sorted(
+        (name for name in os.listdir(images_folder) if name.lower().endswith(('.png', '.jpg', '.jpeg'))),
+        key=capture_order,
+    ) if os.path.exists(images_folder) else []
+
+    entries = {}
+    added = kept = 0
+    with open(frames_path, 'ab') as frames_out:
+        offset = frames_out.tell()
+        for image_name in image_names:
+            image_path = os.path.join(images_folder, image_name)
+            stat = os.stat(image_path)
+            entry = old_entries.get(image_name)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                try:
+                    frame = decode_frame(image_path)
+                except Exception as e:
+                    print(f"Error processing image {image_path}: {e}")
+                    continue
+                frames_out.write(np.ascontiguousarray(frame).tobytes())
+                entry = {
+                    "offset": offset,
+                    "shape": [int(frame.shape[0]), int(frame.shape[1])],
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+                offset += frame.nbytes
+                added += 1
+            else:
+                kept += 1
+            entry["label"] = labels.get(image_name)
+            entry["timestamp"] = parse_timestamp(image_name)
+            entries[image_name] = entry
+
+    temporary = index_path + ".tmp"
+    with open(temporary, 'w') as f:
+        json.dump({"frames_file": frames_file, "frames": entries}, f)
+    os.replace(temporary, index_path)
+
+    for name in os.listdir(pack_folder):
+        if FRAMES_PATTERN.match(name) and name != frames_file:
+            try:
+                os.remove(os.path.join(pack_folder, name))
+            except OSError:
+                pass  # still mapped by a running tool (Windows), removed by a later build
+
+    dropped = len(set(old_entries) - set(entries))
+    return added, kept, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the decoded training images into one memory-mapped file")
+    parser.add_argument("--images", default=IMAGES_FOLDER, help="training image folder")
+    parser.add_argument("--annotations", default=ANNOTATIONS_FILE, help="annotations csv")
+    parser.add_argument("--pack", default=PACK_FOLDER, help="pack output folder")
+    parser.add_argument("--rebuild", action="store_true", help="repack every image, reclaiming unused space")
+    args = parser.parse_args()
+
+    added, kept, dropped = build_pack(args.images, args.annotations, args.pack, rebuild=args.rebuild)
+    print(f"Packed {added + kept} images into {args.pack} ({added} added, {kept} unchanged, {dropped} removed)")
+
+
+if __name__ == "__main__":
+    main()
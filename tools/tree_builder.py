@@ -0,0 +1,216 @@
+import argparse
+import csv
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "clashbot"))
+
+from page_classifier import PAGE_TREE_FILE, PIXEL_DATA_FILE, PageClassifier, PageDecisionTree
+from training_pack import load_frame
+
+
+def entropy(counts):
+    """Entropy in bits of each row of a (tests, classes) count matrix"""
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(totals > 0, counts / totals, 0.0)
+        return -np.sum(np.where(p > 0, p * np.log2(p), 0.0), axis=-1)
+
+
+class PageTreeBuilder:
+    """
+    Compiles the pixel fingerprints into a PageDecisionTree.
+
+    Every training image is classified with the full fingerprint check, and
+    that answer (the set of matching labels) is the class the tree has to
+    reproduce. Candidate tests are the tolerance boundaries of each
+    fingerprint pixel channel; the tree is grown greedily by information gain
+    per new pixel read, so frequent pages are identified after few reads.
+    """
+
+    def __init__(self, tolerance=20, max_depth=32, reuse_discount=0.5):
+        self.tolerance = tolerance
+        self.max_depth = max_depth
+        self.reuse_discount = reuse_discount
+
+        # Get the project root (parent of tools/)
+        script_dir = Path(__file__).parent
+        project_root = script_dir.parent
+
+        # Set paths relative to project root
+        self.images_folder = str(project_root / "data" / "training" / "images")
+        self.annotations_file = str(project_root / "data" / "training" / "annotations.csv")
+
+    def load_annotated_images(self):
+        """Load the names of every annotated image, labeled or not"""
+        images = []
+        if os.path.exists(self.annotations_file):
+            with open(self.annotations_file, 'r', newline='') as f:
+                reader = csv.reader(f)
+                for row in reader:
+                    if row and len(row) >= 2:
+                        images.append(row[0])
+        return images
+
+    def load_frames(self, images):
+        """Decode the training images that exist on disk"""
+        names, frames = [], []
+        for image_name in images:
+            frame = load_frame(os.path.join(self.images_folder, image_name))
+            if frame is None:
+                continue
+            names.append(image_name)
+            frames.append(frame)
+        return names, frames
+
+    def candidate_tests(self, classifier):
+        """Returns (pixel index, channel, threshold) of every fingerprint boundary, and the distinct pixels"""
+        pixels, pixel_index = np.unique(np.stack([classifier.xs, classifier.ys], axis=1), axis=0, return_inverse=True)
+        pixel_index = pixel_index.reshape(-1)
+
+        tests = set()
+        for index, color in zip(pixel_index, classifier.colors):
+            for channel in range(3):
+                # "value > threshold" splits a reference into its lower and upper tolerance edge
+                tests.add((int(index), channel, int(color[channel]) - self.tolerance - 1))
+                tests.add((int(index), channel, int(color[channel]) + self.tolerance))
+        tests = np.asarray(sorted(tests), dtype=np.int32).reshape(-1, 3)
+        return pixels, tests
+
+    def sample(self, frames, pixels):
+        """Gather the distinct fingerprint pixels of every frame, -1 where a pixel is outside the frame"""
+        values = np.full((len(frames), len(pixels), 3), -1, dtype=np.int16)
+        for row, frame in enumerate(frames):
+            inside = (pixels[:, 0] < frame.shape[1]) & (pixels[:, 1] < frame.shape[0])
+            values[row, inside] = frame[pixels[inside, 1], pixels[inside, 0], :3]
+        return values
+
+    def build(self, classifier, frames):
+        """Grow a tree reproducing classifier.classify() on the given frames
+
+        Returns:
+            tuple: the tree and the full fingerprint answer of each frame
+        """
+        answers = [tuple(classifier.classify(frame)) for frame in frames]
+        classes = sorted(set(answers))
+        class_index = {key: index for index, key in enumerate(classes)}
+        targets = np.asarray([class_index[answer] for answer in answers], dtype=np.intp)
+        one_hot = np.eye(len(classes), dtype=np.float32)[targets]
+
+        pixels, tests = self.candidate_tests(classifier)
+        values = self.sample(frames, pixels)
+        outcomes = values[:, tests[:, 0], tests[:, 1]] > tests[:, 2]
+
+        nodes = {"xs": [], "ys": [], "channels": [], "thresholds": [], "left": [], "right": [], "leaves": []}
+
+        def add_node():
+            for column in nodes.values():
+                column.append(-1)
+            return len(nodes["leaves"]) - 1
+
+        def grow(rows, read_pixels, depth):
+            node = add_node()
+            counts = one_hot[rows].sum(axis=0)
+            if np.count_nonzero(counts) <= 1 or depth >= self.max_depth:
+                nodes["leaves"][node] = int(np.argmax(counts))
+                return node
+
+            right_counts = outcomes[rows].T.astype(np.float32) @ one_hot[rows]
+            left_counts = counts - right_counts
+            right_sizes = right_counts.sum(axis=1)
+            child_entropy = (
+                entropy(left_counts) * (len(rows) - right_sizes) + entropy(right_counts) * right_sizes
+            ) / len(rows)
+            gain = entropy(counts) - child_entropy
+
+            # re-reading a pixel already fetched on this path is cheaper than a new one
+            cost = np.where(np.isin(tests[:, 0], list(read_pixels)), self.reuse_discount, 1.0)
+            best = int(np.argmax(np.where(gain > 1e-9, gain / cost, -1.0)))
+            if gain[best] <= 1e-9:
+                nodes["leaves"][node] = int(np.argmax(counts))
+                return node
+
+            pixel, channel, threshold = (int(value) for value in tests[best])
+            nodes["xs"][node], nodes["ys"][node] = int(pixels[pixel, 0]), int(pixels[pixel, 1])
+            nodes["channels"][node], nodes["thresholds"][node] = channel, threshold
+
+            goes_right = outcomes[rows, best]
+            child_pixels = read_pixels | {pixel}
+            nodes["left"][node] = grow(rows[~goes_right], child_pixels, depth + 1)
+            nodes["right"][node] = grow(rows[goes_right], child_pixels, depth + 1)
+            return node
+
+        if len(frames):
+            grow(np.arange(len(frames)), frozenset(), 0)
+        else:
+            add_node()
+            nodes["leaves"][0] = 0
+            classes = [()]
+
+        tree = PageDecisionTree(
+            **{name: np.asarray(column) for name, column in nodes.items()}, classes=classes, classifier=classifier
+        )
+        return tree, answers
+
+    def verify(self, tree, names, frames, answers):
+        """Compare the tree against the full fingerprint answer on every frame
+
+        Returns:
+            list: (image name, expected labels, tree labels) of every disagreement
+        """
+        mismatches = []
+        for name, frame, answer in zip(names, frames, answers):
+            predicted = tuple(tree.classify(frame))
+            if predicted != answer:
+                mismatches.append((name, answer, predicted))
+        return mismatches
+
+    def run(self, pixel_file=PIXEL_DATA_FILE, output=PAGE_TREE_FILE, force=False):
+        classifier = PageClassifier.from_csv(pixel_file, tolerance=self.tolerance)
+        names, frames = self.load_frames(self.load_annotated_images())
+        print(f"Building tree for {len(classifier.labels)} labels from {len(frames)} training images")
+
+        tree, answers = self.build(classifier, frames)
+        mismatches = self.verify(tree, names, frames, answers)
+
+        internal = sum(1 for leaf in tree.leaves if leaf < 0)
+        reads = [tree.depth(frame) for frame in frames]
+        mean_reads = float(np.mean(reads)) if reads else 0.0
+        print(f"{len(tree.leaves)} nodes ({internal} tests), {len(tree.classes)} distinct answers")
+        print(f"Pixel reads per frame: mean {mean_reads:.2f}, max {max(reads, default=0)} "
+              f"(full fingerprint check reads {len(classifier.xs)})")
+
+        if mismatches:
+            print(f"[!] Tree disagrees with the full fingerprint check on {len(mismatches)} images:")
+            for name, expected, predicted in mismatches[:20]:
+                print(f"  - {name}: expected {list(expected)}, got {list(predicted)}")
+            if not force:
+                print("Model not written (use --force to write it anyway)")
+                return False
+        else:
+            print(f"Verified against the full fingerprint check on {len(frames)} images")
+
+        tree.save(output)
+        print(f"Wrote {output}")
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the pixel fingerprints into a page decision tree")
+    parser.add_argument("--pixels", default=PIXEL_DATA_FILE, help="fingerprint csv")
+    parser.add_argument("--output", default=PAGE_TREE_FILE, help="where to write the .npz model")
+    parser.add_argument("--tolerance", type=int, default=20, help="per-channel fingerprint tolerance")
+    parser.add_argument("--max-depth", type=int, default=32, help="maximum tests on any path")
+    parser.add_argument("--force", action="store_true", help="write the model even if verification fails")
+    args = parser.parse_args()
+
+    builder = PageTreeBuilder(tolerance=args.tolerance, max_depth=args.max_depth)
+    ok = builder.run(args.pixels, args.output, force=args.force)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()